@@ -0,0 +1,130 @@
+# analysis.py
+#
+# Position analysis for post-game review and hints: one call evaluates every
+# empty cell x {S, O} of a position. The immediate SOS gain and the replies a
+# move hands to the next mover come straight from one SegmentTracker; the
+# search score comes from sweeps of the alpha-beta search over all candidate
+# moves at increasing depth until the time budget runs out, all sharing one
+# SearchState and one transposition table (which is also kept across calls
+# on the same board size and rules, so reviewing consecutive positions of a
+# game reuses earlier work). Moves that a symmetry of the position maps onto
+# each other are searched once and share the value.
+#
+#     analyzer = PositionAnalyzer()
+#     for evaluation in analyzer.analyze_game_mode(mode, time_budget=0.5)[:5]:
+#         print(evaluation)
+
+import time
+from collections import namedtuple
+
+from search import INFINITY, WIN_SCORE, AlphaBetaSearch, SearchCancelled, SearchState
+from symmetry import representative
+
+# gain     SOS the move completes right away
+# replies  SOS segments the move leaves one letter short, i.e. hands to the next mover
+# value    search score for the mover: net SOS still to come (General), 1/0/-1 for a
+#          forced win/no forced result/forced loss (Simple)
+# margin   General: the mover's final score lead if play follows the search; Simple: value
+MoveEvaluation = namedtuple("MoveEvaluation", "row col letter gain replies value margin")
+
+
+class PositionAnalyzer:
+    """Evaluates every legal move of a position under a time budget."""
+
+    def __init__(self, table_memory=16 * 1024 * 1024):
+        self.search = AlphaBetaSearch(table_memory=table_memory)
+        self.last_stats = None
+
+    def cancel(self):
+        """Stops a running analysis (from another thread); analyze then returns None."""
+        self.search.cancel()
+
+    def analyze_game_mode(self, game_mode, time_budget=1.0, max_depth=None):
+        """Analyzes the current position of a running game mode."""
+        rules = "General" if hasattr(game_mode, "sos_count") else "Simple"
+        return self.analyze(game_mode.board, rules, getattr(game_mode, "sos_count", None),
+                            game_mode.current_color, time_budget, max_depth)
+
+    def analyze(self, board, game_mode="General", scores=None, to_move="Blue", time_budget=1.0, max_depth=None):
+        """Returns a MoveEvaluation for every empty cell and letter, best first.
+
+        ``board`` is indexed ``board[row][col]`` like BaseGameMode.board.
+        ``scores`` maps "Blue"/"Red" to SOS counts (General). The values come
+        from the deepest search sweep that completed within ``time_budget``
+        seconds; if none did, they fall back to the immediate gain (depth 0).
+        Depth, nodes and time used are kept in ``last_stats``. Returns None
+        if cancel() was called.
+        """
+        start = time.perf_counter()
+        size = len(board)
+        simple = game_mode == "Simple"
+        state = SearchState(size, simple, "".join(board[row][col] for row in range(size) for col in range(size)),
+                            track_segments=True)
+        tracker = state.segments
+        candidates = [(row, col, letter, tracker.gain(row * size + col, letter),
+                       tracker.threat_count(row * size + col, letter))
+                      for row, col in sorted(state.empty) for letter in "SO"]
+        symmetries = state.symmetry.symmetries()
+        representatives = [representative(row, col, symmetries, size) + (letter,)
+                           for row, col, letter, _, _ in candidates]
+        # Depth 0: the immediate gain is all that is known
+        values = [(WIN_SCORE if gain else 0) if simple else gain for _, _, _, gain, _ in candidates]
+
+        search = self.search
+        search.use_table_for(state)
+        first_node = search.nodes
+        search.stopped = False
+        search.deadline = start + time_budget
+        remaining = len(state.empty)
+        max_depth = min(max_depth or remaining, remaining)
+        depth_reached = 0
+        try:
+            for depth in range(1, max_depth + 1):
+                search.table.new_search()
+                searched = {}
+                for (row, col, letter, gain, _), move in zip(candidates, representatives):
+                    if move == (row, col, letter):
+                        searched[move] = self.move_value(state, row, col, letter, gain, depth)
+                values = [searched[move] for move in representatives]
+                depth_reached = depth
+        except SearchCancelled:
+            if search.stopped:
+                return None
+        finally:
+            search.deadline = INFINITY
+
+        lead = 0
+        if not simple and scores:
+            lead = scores[to_move] - scores["Red" if to_move == "Blue" else "Blue"]
+        evaluations = []
+        for (row, col, letter, gain, replies), value in zip(candidates, values):
+            if simple:
+                value = 1 if value >= WIN_SCORE else -1 if value <= -WIN_SCORE else 0
+                margin = value
+            else:
+                margin = lead + value
+            evaluations.append(MoveEvaluation(row, col, letter, gain, replies, value, margin))
+        evaluations.sort(key=lambda evaluation: (-evaluation.value, -evaluation.gain, evaluation.replies))
+        self.last_stats = {
+            "depth": depth_reached,
+            "seconds": time.perf_counter() - start,
+            "nodes": search.nodes - first_node,
+            "moves": len(evaluations),
+        }
+        return evaluations
+
+    def move_value(self, state, row, col, letter, gain, depth):
+        """Exact value of one candidate move searched ``depth`` plies deep (the move itself included)."""
+        if state.simple and gain > 0:
+            return WIN_SCORE + depth
+        state.play(row, col, letter)
+        if state.empty.is_full():
+            value = gain
+        elif gain > 0:
+            # Extra turn: the mover moves again, so the child value is not negated
+            value = gain + self.search.negamax(state, depth - 1, -INFINITY, INFINITY)
+        else:
+            value = -self.search.negamax(state, depth - 1, -INFINITY, INFINITY)
+        # Not reached when the search is cancelled; the state is then discarded
+        state.unplay(row, col, letter)
+        return value
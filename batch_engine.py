@@ -0,0 +1,204 @@
+# batch_engine.py
+#
+# Lockstep engine that plays K games at once with NumPy. Every step applies one
+# move to each unfinished game as a single vectorized operation, then detects
+# the SOS patterns formed by the placed cells and updates scores, turns and
+# done flags for the whole batch. The rules match BaseGameMode.check_sos and
+# the Simple/General game modes exactly, including General extra turns.
+#
+# count_board_sos recounts every SOS on one board or a stack of boards from
+# scratch with sliding-window comparisons; BatchEngine.audit uses it to check
+# the incrementally kept scores when games end, and audit_game_mode does the
+# same for a single game mode, e.g. an imported or replayed position.
+
+import numpy as np
+
+EMPTY, S, O = 0, 1, 2
+BLUE, RED = 0, 1
+NO_WINNER = -1
+
+DIRECTIONS = ((0, 1), (1, 0), (1, 1), (1, -1))
+
+# Letter codes indexed by character byte, for encoding boards
+LETTER_CODES = np.zeros(256, dtype=np.int8)
+LETTER_CODES[ord('S')] = S
+LETTER_CODES[ord('O')] = O
+
+
+def count_board_sos(boards):
+    """Counts every SOS on an (n, n) board or on each board of a (K, n, n) stack.
+
+    Cells hold EMPTY, S or O. Returns an int for a single board and a (K,)
+    array for a stack. Each direction is one vectorized comparison of the
+    board against itself shifted by one and two cells.
+    """
+    boards = np.asarray(boards)
+    is_s = boards == S
+    is_o = boards == O
+    total = 0
+    for window in (
+        (np.s_[..., :, :-2], np.s_[..., :, 1:-1], np.s_[..., :, 2:]),  # Horizontal
+        (np.s_[..., :-2, :], np.s_[..., 1:-1, :], np.s_[..., 2:, :]),  # Vertical
+        (np.s_[..., :-2, :-2], np.s_[..., 1:-1, 1:-1], np.s_[..., 2:, 2:]),  # Diagonal down-right
+        (np.s_[..., :-2, 2:], np.s_[..., 1:-1, 1:-1], np.s_[..., 2:, :-2]),  # Diagonal down-left
+    ):
+        first, middle, last = window
+        total = total + (is_s[first] & is_o[middle] & is_s[last]).sum(axis=(-2, -1))
+    return int(total) if boards.ndim == 2 else total
+
+
+def encode_board(game_mode):
+    """Returns the board of a game mode (any backend) as an (n, n) int8 array of EMPTY/S/O."""
+    size = game_mode.board_size
+    board = game_mode.board
+    cells = getattr(board, "cells", None)
+    if isinstance(cells, dict):
+        # Sparse board: only the occupied cells need writing
+        encoded = np.zeros(size * size, dtype=np.int8)
+        if cells:
+            encoded[np.fromiter(cells.keys(), dtype=np.int64, count=len(cells))] = \
+                LETTER_CODES[np.frombuffer("".join(cells.values()).encode(), dtype=np.uint8)]
+        return encoded.reshape(size, size)
+    letters = "".join(board.get(row, col) for row in range(size) for col in range(size))
+    return LETTER_CODES[np.frombuffer(letters.encode(), dtype=np.uint8)].reshape(size, size)
+
+
+def audit_game_mode(game_mode):
+    """Recounts a game mode's board from scratch and returns a list of inconsistencies (empty if none).
+
+    In General mode the SOS on the board must add up to both players' scores;
+    in Simple mode a finished game has SOS on the board exactly when it has a
+    winner, and an unfinished one has none.
+    """
+    count = count_board_sos(encode_board(game_mode))
+    scores = getattr(game_mode, "sos_count", None)
+    if scores is not None:
+        if count != scores["Blue"] + scores["Red"]:
+            return [f"board holds {count} SOS, scores add up to {scores['Blue'] + scores['Red']}"]
+    elif (count > 0) != (game_mode.winner is not None):
+        return [f"board holds {count} SOS, winner is {game_mode.winner}"]
+    return []
+
+
+class BatchEngine:
+    """K games of the same size and mode held as one (K, n, n) int8 array.
+
+    The board is stored with two cells of padding on every side so that the
+    triples around any placed cell can be gathered without bounds checks;
+    ``boards`` is the (K, n, n) view of the playing area. Cells hold EMPTY, S
+    or O. ``scores[:, BLUE]``/``scores[:, RED]`` count SOS per player,
+    ``to_move`` holds BLUE or RED, and ``winner`` is NO_WINNER until a game
+    ends with a winner.
+    """
+
+    def __init__(self, games, board_size, game_mode="Simple", seed=None):
+        if game_mode not in ("Simple", "General"):
+            raise ValueError(f"Unknown game mode: {game_mode!r}")
+        self.games = games
+        self.board_size = board_size
+        self.simple = game_mode == "Simple"
+        self.rng = np.random.default_rng(seed)
+        self.padded = np.zeros((games, board_size + 4, board_size + 4), dtype=np.int8)
+        self.boards = self.padded[:, 2:-2, 2:-2]
+        self.scores = np.zeros((games, 2), dtype=np.int32)
+        self.to_move = np.zeros(games, dtype=np.int8)
+        self.empty_count = np.full(games, board_size * board_size, dtype=np.int32)
+        self.done = np.zeros(games, dtype=bool)
+        self.winner = np.full(games, NO_WINNER, dtype=np.int8)
+        self.moves_played = 0
+
+    def reset(self):
+        """Clears every board and result."""
+        self.padded[:] = EMPTY
+        self.scores[:] = 0
+        self.to_move[:] = BLUE
+        self.empty_count[:] = self.board_size * self.board_size
+        self.done[:] = False
+        self.winner[:] = NO_WINNER
+        self.moves_played = 0
+
+    def count_sos(self, games, rows, cols):
+        """Counts the SOS patterns through cell (rows[i], cols[i]) of game games[i], for every i."""
+        pr, pc = rows + 2, cols + 2
+        counts = np.zeros(len(games), dtype=np.int32)
+        # Each direction has three triples through the cell: it is the last, middle or first letter
+        for (dr, dc), start in ((direction, start) for direction in DIRECTIONS for start in (-2, -1, 0)):
+            first = self.padded[games, pr + start * dr, pc + start * dc]
+            middle = self.padded[games, pr + (start + 1) * dr, pc + (start + 1) * dc]
+            last = self.padded[games, pr + (start + 2) * dr, pc + (start + 2) * dc]
+            counts += (first == S) & (middle == O) & (last == S)
+        return counts
+
+    def random_moves(self):
+        """Picks a uniformly random empty cell and letter for every unfinished game.
+
+        Returns (games, rows, cols, letters) for the games that still have to move.
+        """
+        games = np.flatnonzero(~self.done)
+        flat = self.boards[games].reshape(len(games), -1)
+        keys = self.rng.random(flat.shape)
+        keys[flat != EMPTY] = -1.0
+        cells = keys.argmax(axis=1)
+        letters = self.rng.integers(S, O + 1, size=len(games), dtype=np.int8)
+        rows, cols = np.divmod(cells, self.board_size)
+        return games, rows, cols, letters
+
+    def step(self, games, rows, cols, letters):
+        """Applies one move to each listed game and resolves it under the game's rules.
+
+        ``games`` must hold distinct indices of unfinished games whose target
+        cells are empty. Returns the number of SOS formed by each move.
+        """
+        self.padded[games, rows + 2, cols + 2] = letters
+        self.empty_count[games] -= 1
+        sos = self.count_sos(games, rows, cols)
+        movers = self.to_move[games]
+        full = self.empty_count[games] == 0
+        formed = sos > 0
+
+        if self.simple:
+            won = games[formed]
+            self.winner[won] = movers[formed]
+            self.done[won] = True
+            self.done[games[full]] = True
+        else:
+            self.scores[games, movers] += sos
+            finished = games[full]
+            blue, red = self.scores[finished, BLUE], self.scores[finished, RED]
+            self.winner[finished] = np.where(blue > red, BLUE, np.where(red > blue, RED, NO_WINNER))
+            self.done[finished] = True
+
+        # The turn passes unless the move formed an SOS (General extra turn) or ended the game
+        passes = ~formed & ~full
+        self.to_move[games[passes]] ^= 1
+        self.moves_played += 1
+        return sos
+
+    def play_random(self):
+        """Plays every unfinished game to the end with random moves; returns the winner array."""
+        while not self.done.all():
+            self.step(*self.random_moves())
+        return self.winner
+
+    def audit(self):
+        """Recounts every finished board from scratch; returns the indices of games whose result disagrees.
+
+        General games must have scores adding up to the SOS on the board,
+        Simple games must have SOS on the board exactly when they have a winner.
+        """
+        games = np.flatnonzero(self.done)
+        counts = count_board_sos(self.boards[games])
+        if self.simple:
+            bad = (counts > 0) != (self.winner[games] != NO_WINNER)
+        else:
+            bad = counts != self.scores[games].sum(axis=1)
+        return games[bad]
+
+    def results(self):
+        """Returns counts of Blue wins, Red wins and draws over finished games."""
+        finished = self.winner[self.done]
+        return {
+            "Blue": int((finished == BLUE).sum()),
+            "Red": int((finished == RED).sum()),
+            "Draw": int((finished == NO_WINNER).sum()),
+        }
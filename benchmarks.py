@@ -0,0 +1,267 @@
+# benchmarks.py
+#
+# Reproducible benchmark suite for the engine hot paths. For every board size
+# and game mode it measures BaseGameMode.make_move, apply/undo, check_sos,
+# GameManager.is_board_full, ComputerPlayer.make_move and complete games per
+# second, plus the peak memory allocated while playing one game. Results are
+# written as JSON and can be compared against a saved baseline; metrics that
+# got worse by more than the threshold are reported as regressions.
+#
+#     python -m benchmarks --output bench.json
+#     python -m benchmarks --baseline bench.json --threshold 0.1
+
+import argparse
+import json
+import platform
+import random
+import sys
+import time
+import tracemalloc
+
+from boards import BOARD_BACKENDS
+from game_manager import GameManager
+from game_modes import SimpleGameMode, GeneralGameMode
+from player import ComputerPlayer
+from simulate import play_game
+
+GAME_MODES = {"Simple": SimpleGameMode, "General": GeneralGameMode}
+
+
+def measure(operation, min_time):
+    """Repeats ``operation`` for at least ``min_time`` seconds and returns operations per second.
+
+    ``operation`` returns how many operations it performed in one call.
+    """
+    operations = 0
+    elapsed = 0.0
+    while elapsed < min_time:
+        start = time.perf_counter()
+        operations += operation()
+        elapsed += time.perf_counter() - start
+    return operations / elapsed
+
+
+def shuffled_cells(board_size, rng):
+    """Returns every cell with a random letter, in random order."""
+    cells = [(row, col, rng.choice("SO")) for row in range(board_size) for col in range(board_size)]
+    rng.shuffle(cells)
+    return cells
+
+
+def filled_mode(game_mode, board_size, backend, rng, fraction=1.0):
+    """Returns a game mode whose board is filled to ``fraction`` with random letters."""
+    mode = GAME_MODES[game_mode](board_size, backend=backend)
+    mode.reset_game(board_size)
+    cells = shuffled_cells(board_size, rng)
+    for row, col, letter in cells[:int(len(cells) * fraction)]:
+        mode.place_character(row, col, letter)
+    return mode
+
+
+def bench_make_move(game_mode, board_size, backend, rng, min_time):
+    mode = GAME_MODES[game_mode](board_size, backend=backend)
+    sequences = [shuffled_cells(board_size, rng) for _ in range(8)]
+    moves = 0
+    elapsed = 0.0
+    while elapsed < min_time:
+        for cells in sequences:
+            # Only the moves are timed, not the reset between games
+            mode.reset_game(board_size)
+            start = time.perf_counter()
+            for played, (row, col, letter) in enumerate(cells, 1):
+                mode.make_move(row, col, letter)
+                if not mode.is_game_active:
+                    break  # A Simple game ends with its first SOS
+            elapsed += time.perf_counter() - start
+            moves += played
+    return moves / elapsed
+
+
+def bench_apply_undo(game_mode, board_size, backend, rng, min_time):
+    mode = GAME_MODES[game_mode](board_size, backend=backend)
+    mode.reset_game(board_size)
+    # Lookahead-style workload: make every move of a line, then take them all back
+    cells = shuffled_cells(board_size, rng)
+
+    def operation():
+        records = []
+        for row, col, letter in cells:
+            record = mode.apply(row, col, letter)
+            if record is None:
+                break
+            records.append(record)
+        for record in reversed(records):
+            mode.undo(record)
+        return 2 * len(records)
+
+    return measure(operation, min_time)
+
+
+def bench_check_sos(game_mode, board_size, backend, rng, min_time):
+    mode = filled_mode(game_mode, board_size, backend, rng)
+    cells = [(row, col) for row in range(board_size) for col in range(board_size)]
+
+    def operation():
+        for row, col in cells:
+            mode.check_sos(row, col)
+        return len(cells)
+
+    return measure(operation, min_time)
+
+
+def bench_is_board_full(game_mode, board_size, backend, rng, min_time):
+    manager = GameManager(board_size, game_mode, board_backend=backend)
+    manager.reset_game(board_size, game_mode, "Computer", "Computer")
+    for row, col, letter in shuffled_cells(board_size, rng)[:board_size * board_size // 2]:
+        manager.mode.place_character(row, col, letter)
+
+    def operation():
+        for _ in range(100):
+            manager.is_board_full()
+        return 100
+
+    return measure(operation, min_time)
+
+
+def bench_computer_move(game_mode, board_size, backend, rng, min_time):
+    manager = GameManager(board_size, game_mode, board_backend=backend)
+
+    def operation():
+        manager.reset_game(board_size, game_mode, "Computer", "Computer")
+        moves = 0
+        while manager.is_game_active:
+            manager.current_player.make_move(manager.mode)
+            moves += 1
+        return moves
+
+    return measure(operation, min_time)
+
+
+def bench_full_game(game_mode, board_size, backend, rng, min_time):
+    mode = GAME_MODES[game_mode](board_size, backend=backend)
+    players = {"Blue": ComputerPlayer("Blue", "Blue"), "Red": ComputerPlayer("Red", "Red")}
+
+    def operation():
+        mode.reset_game(board_size)
+        play_game(mode, players)
+        return 1
+
+    return measure(operation, min_time)
+
+
+def peak_memory_per_game(game_mode, board_size, backend, games=5):
+    """Returns the highest peak of traced allocations over a few complete games, in bytes."""
+    players = {"Blue": ComputerPlayer("Blue", "Blue"), "Red": ComputerPlayer("Red", "Red")}
+    peak = 0
+    tracemalloc.start()
+    try:
+        for _ in range(games):
+            tracemalloc.reset_peak()
+            baseline = tracemalloc.get_traced_memory()[0]
+            mode = GAME_MODES[game_mode](board_size, backend=backend)
+            mode.reset_game(board_size)
+            play_game(mode, players)
+            peak = max(peak, tracemalloc.get_traced_memory()[1] - baseline)
+            del mode
+    finally:
+        tracemalloc.stop()
+    return peak
+
+
+# Benchmark name -> function returning operations per second
+BENCHMARKS = {
+    "make_move": bench_make_move,
+    "apply_undo": bench_apply_undo,
+    "check_sos": bench_check_sos,
+    "is_board_full": bench_is_board_full,
+    "computer_make_move": bench_computer_move,
+    "full_game": bench_full_game,
+}
+
+
+def run_benchmarks(sizes, game_modes, backend="list", seed=0, min_time=0.2, progress=None):
+    """Runs the whole suite and returns the JSON-ready result document."""
+    results = {}
+    for game_mode in game_modes:
+        for board_size in sizes:
+            for name, benchmark in BENCHMARKS.items():
+                # Reseed per benchmark so each one sees the same boards whatever else runs
+                rng = random.Random(f"{seed}/{game_mode}/{board_size}/{name}")
+                random.seed(rng.getrandbits(64))
+                value = benchmark(game_mode, board_size, backend, rng, min_time)
+                results[f"{game_mode}/{board_size}/{name}"] = {"value": value, "unit": "ops/s", "better": "higher"}
+                if progress:
+                    progress(game_mode, board_size, name, value)
+            random.seed(seed)
+            value = peak_memory_per_game(game_mode, board_size, backend)
+            results[f"{game_mode}/{board_size}/peak_memory"] = {"value": value, "unit": "bytes", "better": "lower"}
+            if progress:
+                progress(game_mode, board_size, "peak_memory", value)
+    return {
+        "meta": {
+            "python": sys.version.split()[0],
+            "platform": platform.platform(),
+            "backend": backend,
+            "seed": seed,
+            "min_time": min_time,
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        },
+        "results": results,
+    }
+
+
+def compare(current, baseline, threshold):
+    """Returns (name, baseline value, current value, relative change) for every regressed metric.
+
+    The relative change is signed so that negative always means worse.
+    """
+    regressions = []
+    for name, metric in current["results"].items():
+        old = baseline["results"].get(name)
+        if not old or not old["value"]:
+            continue
+        change = (metric["value"] - old["value"]) / old["value"]
+        if metric["better"] == "lower":
+            change = -change
+        if change < -threshold:
+            regressions.append((name, old["value"], metric["value"], change))
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the SOS engine hot paths.")
+    parser.add_argument("--sizes", nargs="+", type=int, default=list(range(3, 21)), help="board sizes")
+    parser.add_argument("--modes", nargs="+", choices=sorted(GAME_MODES), default=["Simple", "General"],
+                        help="game modes")
+    parser.add_argument("--backend", choices=sorted(BOARD_BACKENDS), default="list", help="board backend")
+    parser.add_argument("--seed", type=int, default=0, help="random seed")
+    parser.add_argument("--min-time", type=float, default=0.2, help="seconds to spend on each measurement")
+    parser.add_argument("--output", help="write results as JSON to this file")
+    parser.add_argument("--baseline", help="compare against a saved JSON result file")
+    parser.add_argument("--threshold", type=float, default=0.1,
+                        help="relative slowdown that counts as a regression (default 0.1 = 10%%)")
+    args = parser.parse_args(argv)
+
+    def progress(game_mode, board_size, name, value):
+        unit = "bytes" if name == "peak_memory" else "ops/s"
+        print(f"{game_mode:<8} {board_size:>2}x{board_size:<2} {name:<20} {value:>14,.0f} {unit}")
+
+    report = run_benchmarks(args.sizes, args.modes, args.backend, args.seed, args.min_time, progress)
+    if args.output:
+        with open(args.output, "w") as handle:
+            json.dump(report, handle, indent=2)
+
+    if args.baseline:
+        with open(args.baseline) as handle:
+            baseline = json.load(handle)
+        regressions = compare(report, baseline, args.threshold)
+        for name, old, new, change in regressions:
+            print(f"REGRESSION {name}: {old:,.0f} -> {new:,.0f} ({change:+.1%})")
+        if regressions:
+            return 1
+        print(f"No regressions beyond {args.threshold:.0%} against {args.baseline}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,394 @@
+# boards.py
+#
+# Board backends used by the game modes. Every backend stores the letters of
+# one n x n board and answers the questions the rules need: what is in a
+# cell, how many SOS patterns run through a cell, whether the board is full
+# and which cells are still empty. Backends are looked up by name through
+# BOARD_BACKENDS so the game modes, GameManager and simulator can select one.
+
+import random
+
+# Largest board the game accepts; boards above SPARSE_THRESHOLD default to the sparse backend
+MAX_BOARD_SIZE = 1000
+SPARSE_THRESHOLD = 50
+
+DIRECTIONS = [
+    (0, 1),  # Horizontal
+    (1, 0),  # Vertical
+    (1, 1),  # Diagonal top-left to bottom-right
+    (1, -1)  # Diagonal top-right to bottom-left
+]
+
+
+class ListBoard(list):
+    """The classic board: a list of rows, each a list of one-character strings.
+
+    Being a list subclass, ``board[row][col]`` reads and writes work exactly as
+    they always have.
+    """
+
+    def __init__(self, board_size):
+        super().__init__([' ' for _ in range(board_size)] for _ in range(board_size))
+        self.board_size = board_size
+
+    def get(self, row, col):
+        """Returns the character at the given cell (' ' when empty)."""
+        return self[row][col]
+
+    def place(self, row, col, character):
+        """Writes a character into a cell."""
+        self[row][col] = character
+
+    def clear(self, row, col):
+        """Empties a cell."""
+        self[row][col] = ' '
+
+    def count_sos(self, row, col):
+        """Counts the number of SOS patterns created around the given row, col position."""
+        sos_count = 0
+        for dx, dy in DIRECTIONS:
+            sos_count += self.is_sos_sequence(row - 2 * dx, col - 2 * dy, row - dx, col - dy, row, col)
+            sos_count += self.is_sos_sequence(row - dx, col - dy, row, col, row + dx, col + dy)
+            sos_count += self.is_sos_sequence(row, col, row + dx, col + dy, row + 2 * dx, col + 2 * dy)
+        return sos_count
+
+    def is_sos_sequence(self, x1, y1, x2, y2, x3, y3):
+        """Helper method to check for 'S-O-S' sequence in given positions."""
+        if self.is_valid_position(x1, y1) and self.is_valid_position(x2, y2) and self.is_valid_position(x3, y3):
+            if self[x1][y1] == 'S' and self[x2][y2] == 'O' and self[x3][y3] == 'S':
+                return 1
+        return 0
+
+    def is_valid_position(self, row, col):
+        """Checks if the given position is within the board boundaries."""
+        return 0 <= row < self.board_size and 0 <= col < self.board_size
+
+    def is_full(self):
+        """Checks if the entire board is filled."""
+        return all(cell != ' ' for row in self for cell in row)
+
+    def empty_cells(self):
+        """Returns the (row, col) pairs of every empty cell."""
+        return [(r, c) for r in range(self.board_size) for c in range(self.board_size) if self[r][c] == ' ']
+
+
+class BitBoard:
+    """Board stored as two integer bitmasks, one for S and one for O.
+
+    Cell (row, col) lives at bit ``origin + row * width + col`` where the row
+    stride ``width`` is ``board_size + 2``. The two padding columns per row and
+    the two padding rows above and below the playing area are never set, so
+    every neighbour up to two steps away in any direction is a valid bit index
+    that simply reads as empty: SOS detection needs no bounds checks.
+    """
+
+    def __init__(self, board_size):
+        self.board_size = board_size
+        self.width = board_size + 2
+        # Two padding rows plus two bits, so that index - 2 * (width + 1) >= 0 for every cell
+        self.origin = 2 * self.width + 2
+        # Direction steps as bit offsets: horizontal, vertical and both diagonals
+        self.steps = (1, self.width, self.width + 1, self.width - 1)
+        self.windows = tuple((1 | 1 << step | 1 << 2 * step, (1 << 4 * step + 1) - 1) for step in self.steps)
+        self.full_mask = 0
+        for r in range(board_size):
+            self.full_mask |= ((1 << board_size) - 1) << self.index(r, 0)
+        self.s_bits = 0
+        self.o_bits = 0
+
+    def index(self, row, col):
+        """Returns the bit index of a cell."""
+        return self.origin + row * self.width + col
+
+    def cell(self, index):
+        """Returns the (row, col) pair for a bit index."""
+        return divmod(index - self.origin, self.width)
+
+    def get(self, row, col):
+        """Returns the character at the given cell (' ' when empty)."""
+        bit = 1 << self.index(row, col)
+        if self.s_bits & bit:
+            return 'S'
+        if self.o_bits & bit:
+            return 'O'
+        return ' '
+
+    def __getitem__(self, row):
+        """Returns one row as a list of characters, for read-only ``board[row][col]`` access."""
+        return [self.get(row, col) for col in range(self.board_size)]
+
+    def __iter__(self):
+        return (self[row] for row in range(self.board_size))
+
+    def __len__(self):
+        return self.board_size
+
+    def place(self, row, col, character):
+        """Writes a character into an empty cell."""
+        if character == 'S':
+            self.s_bits |= 1 << self.index(row, col)
+        else:
+            self.o_bits |= 1 << self.index(row, col)
+
+    def clear(self, row, col):
+        """Empties a cell."""
+        mask = ~(1 << self.index(row, col))
+        self.s_bits &= mask
+        self.o_bits &= mask
+
+    def count_sos(self, row, col):
+        """Counts the SOS patterns that pass through the given cell.
+
+        For each direction step ``d`` the S and O masks are shifted so that the
+        window starting two steps before the cell sits at bit 0 and trimmed to
+        that window. An SOS starts at bit ``i`` when S is set at ``i``, O at
+        ``i + d`` and S at ``i + 2d``; only starts at 0, d and 2d include the cell.
+        """
+        index = self.index(row, col)
+        s_bits, o_bits = self.s_bits, self.o_bits
+        sos_count = 0
+        for step, (starts, span) in zip(self.steps, self.windows):
+            shift = index - 2 * step
+            s_local = (s_bits >> shift) & span
+            o_local = (o_bits >> shift) & span
+            sos_count += (s_local & (o_local >> step) & (s_local >> 2 * step) & starts).bit_count()
+        return sos_count
+
+    def completing_masks(self):
+        """Returns masks of the empty cells where an S, respectively an O, would complete an SOS.
+
+        Computed for the whole board at once: an S completes at bit ``p`` when
+        O and S sit one and two steps away in the same direction, an O when S
+        sits one step away on both sides.
+        """
+        s_bits, o_bits = self.s_bits, self.o_bits
+        s_mask = o_mask = 0
+        for step in self.steps:
+            s_mask |= ((o_bits >> step) & (s_bits >> 2 * step)) | ((o_bits << step) & (s_bits << 2 * step))
+            o_mask |= (s_bits >> step) & (s_bits << step)
+        free = self.full_mask & ~(s_bits | o_bits)
+        return s_mask & free, o_mask & free
+
+    def is_full(self):
+        """Checks if the entire board is filled."""
+        return (self.s_bits | self.o_bits) == self.full_mask
+
+    def empty_cells(self):
+        """Returns the (row, col) pairs of every empty cell."""
+        free = self.full_mask & ~(self.s_bits | self.o_bits)
+        cells = []
+        while free:
+            low = free & -free
+            cells.append(self.cell(low.bit_length() - 1))
+            free ^= low
+        return cells
+
+
+class SparseBoard:
+    """Board that stores only the occupied cells, in a dict keyed by flat cell index.
+
+    Memory grows with the number of moves played rather than with the board
+    area, so boards of 1000 x 1000 cost nothing up front. Reads of cells that
+    were never written return ' '. SOS detection looks at the 12 triples
+    through a cell with dict lookups, independent of the board size.
+    """
+
+    def __init__(self, board_size):
+        self.board_size = board_size
+        self.cells = {}  # row * board_size + col -> 'S' or 'O'
+
+    def get(self, row, col):
+        """Returns the character at the given cell (' ' when empty)."""
+        return self.cells.get(row * self.board_size + col, ' ')
+
+    def __getitem__(self, row):
+        """Returns one row as a list of characters, for read-only ``board[row][col]`` access."""
+        return [self.get(row, col) for col in range(self.board_size)]
+
+    def __iter__(self):
+        return (self[row] for row in range(self.board_size))
+
+    def __len__(self):
+        return self.board_size
+
+    def place(self, row, col, character):
+        """Writes a character into a cell."""
+        self.cells[row * self.board_size + col] = character
+
+    def clear(self, row, col):
+        """Empties a cell."""
+        self.cells.pop(row * self.board_size + col, None)
+
+    def count_sos(self, row, col):
+        """Counts the number of SOS patterns created around the given row, col position."""
+        size = self.board_size
+        cells = self.cells
+        sos_count = 0
+        for dr, dc in DIRECTIONS:
+            # The cell is the first, middle or last letter of the triple starting at (r, c)
+            for start in (2, 1, 0):
+                r, c = row - start * dr, col - start * dc
+                end_r, end_c = r + 2 * dr, c + 2 * dc
+                if 0 <= r < size and 0 <= c < size and 0 <= end_r < size and 0 <= end_c < size:
+                    first = r * size + c
+                    step = dr * size + dc
+                    if cells.get(first) == 'S' and cells.get(first + step) == 'O' \
+                            and cells.get(first + 2 * step) == 'S':
+                        sos_count += 1
+        return sos_count
+
+    def is_valid_position(self, row, col):
+        """Checks if the given position is within the board boundaries."""
+        return 0 <= row < self.board_size and 0 <= col < self.board_size
+
+    def is_full(self):
+        """Checks if the entire board is filled."""
+        return len(self.cells) == self.board_size * self.board_size
+
+    def empty_cells(self):
+        """Returns the (row, col) pairs of every empty cell (this one is proportional to the board area)."""
+        return [(r, c) for r in range(self.board_size) for c in range(self.board_size)
+                if r * self.board_size + c not in self.cells]
+
+
+class EmptyCellIndex:
+    """Set of empty cells kept up to date as moves are made.
+
+    Cells are stored as flat ids (``row * board_size + col``) in a dense list,
+    with a parallel position table so that a cell can be removed by swapping
+    it with the last entry. Size checks, removal, re-insertion and uniform
+    random selection are all O(1).
+    """
+
+    def __init__(self, board_size):
+        self.board_size = board_size
+        self.cells = list(range(board_size * board_size))
+        self.positions = list(range(board_size * board_size))
+
+    def __len__(self):
+        return len(self.cells)
+
+    def __iter__(self):
+        return (divmod(cell, self.board_size) for cell in self.cells)
+
+    def __contains__(self, position):
+        row, col = position
+        return self.positions[row * self.board_size + col] >= 0
+
+    def is_full(self):
+        """True when no empty cell is left on the board."""
+        return not self.cells
+
+    def remove(self, row, col):
+        """Marks a cell as occupied."""
+        cell = row * self.board_size + col
+        index = self.positions[cell]
+        last = self.cells.pop()
+        if last != cell:
+            self.cells[index] = last
+            self.positions[last] = index
+        self.positions[cell] = -1
+
+    def add(self, row, col):
+        """Marks a cell as empty again."""
+        cell = row * self.board_size + col
+        if self.positions[cell] < 0:
+            self.positions[cell] = len(self.cells)
+            self.cells.append(cell)
+
+    def random_cell(self, rng=random):
+        """Returns a uniformly chosen empty (row, col), or None if the board is full."""
+        if not self.cells:
+            return None
+        return divmod(self.cells[int(rng.random() * len(self.cells))], self.board_size)
+
+
+class SparseEmptyCells:
+    """EmptyCellIndex for very large boards, storing the occupied cells instead of the empty ones.
+
+    The empty count is kept incrementally. While at least half the board is
+    empty, random cells are drawn by rejection sampling (fewer than two
+    draws on average); once the board is more than half full, a dense
+    index of the remaining empty cells is built, which then costs no more
+    memory than the occupied set.
+    """
+
+    def __init__(self, board_size):
+        self.board_size = board_size
+        self.area = board_size * board_size
+        self.occupied = set()
+        self.dense = None  # EmptyCellIndex-style (cells, positions) once the board is half full
+
+    def __len__(self):
+        return self.area - len(self.occupied)
+
+    def __iter__(self):
+        if self.dense is not None:
+            return (divmod(cell, self.board_size) for cell in self.dense[0])
+        return (divmod(cell, self.board_size) for cell in range(self.area) if cell not in self.occupied)
+
+    def __contains__(self, position):
+        row, col = position
+        return row * self.board_size + col not in self.occupied
+
+    def is_full(self):
+        """True when no empty cell is left on the board."""
+        return len(self.occupied) == self.area
+
+    def remove(self, row, col):
+        """Marks a cell as occupied."""
+        cell = row * self.board_size + col
+        self.occupied.add(cell)
+        if self.dense is not None:
+            cells, positions = self.dense
+            index = positions.pop(cell)
+            last = cells.pop()
+            if last != cell:
+                cells[index] = last
+                positions[last] = index
+        elif 2 * len(self.occupied) >= self.area:
+            cells = [cell for cell in range(self.area) if cell not in self.occupied]
+            self.dense = (cells, {cell: index for index, cell in enumerate(cells)})
+
+    def add(self, row, col):
+        """Marks a cell as empty again."""
+        cell = row * self.board_size + col
+        if cell in self.occupied:
+            self.occupied.discard(cell)
+            if self.dense is not None:
+                cells, positions = self.dense
+                positions[cell] = len(cells)
+                cells.append(cell)
+
+    def random_cell(self, rng=random):
+        """Returns a uniformly chosen empty (row, col), or None if the board is full."""
+        if len(self.occupied) == self.area:
+            return None
+        if self.dense is not None:
+            cells = self.dense[0]
+            return divmod(cells[int(rng.random() * len(cells))], self.board_size)
+        while True:
+            cell = int(rng.random() * self.area)
+            if cell not in self.occupied:
+                return divmod(cell, self.board_size)
+
+
+BOARD_BACKENDS = {"list": ListBoard, "bitboard": BitBoard, "sparse": SparseBoard}
+
+
+def make_board(board_size, backend="list"):
+    """Creates an empty board using the named backend."""
+    try:
+        return BOARD_BACKENDS[backend](board_size)
+    except KeyError:
+        raise ValueError(f"Unknown board backend: {backend!r}") from None
+
+
+def make_empty_cells(board_size, backend="list"):
+    """Creates the empty-cell index that goes with a board backend."""
+    return SparseEmptyCells(board_size) if backend == "sparse" else EmptyCellIndex(board_size)
+
+
+def default_backend(board_size):
+    """Returns the backend to use for a board size when none was chosen."""
+    return "sparse" if board_size > SPARSE_THRESHOLD else "list"
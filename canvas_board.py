@@ -0,0 +1,71 @@
+import tkinter as tk
+
+
+class CanvasGameBoard:
+    """Game board drawn on a single tk.Canvas.
+
+    A drop-in alternative to GameBoard: clicks are mapped to cells by integer
+    division, a cell's text item is only created or changed when that cell
+    changes, and the same canvas is reused across games through ``reset``.
+    """
+
+    max_board_pixels = 500
+    max_cell_size = 50
+    min_cell_size = 10  # Smallest cell that can still be clicked and read
+    max_board_size = max_board_pixels // min_cell_size
+
+    def __init__(self, parent, board_size, on_click_callback):
+        self.parent = parent
+        self.on_click_callback = on_click_callback
+        self.canvas = tk.Canvas(parent, highlightthickness=0, background="white")
+        self.canvas.grid(row=0, column=0, sticky="nsew")
+        self.canvas.bind("<Button-1>", self.on_click)
+        self.reset(board_size)
+
+    def reset(self, board_size):
+        """Clears the board and redraws the grid for a new game of the given size."""
+        self.board_size = board_size
+        self.cell_size = max(self.min_cell_size, min(self.max_cell_size, self.max_board_pixels // board_size))
+        self.font = ("TkDefaultFont", max(8, self.cell_size // 2), "bold")
+        self.cell_items = {}  # (row, col) -> (canvas text item, text)
+        self.enabled = True
+
+        size = board_size * self.cell_size
+        self.canvas.delete("all")
+        self.canvas.config(width=size + 1, height=size + 1, background="white")
+        for i in range(board_size + 1):
+            offset = i * self.cell_size
+            self.canvas.create_line(offset, 0, offset, size, fill="gray50")
+            self.canvas.create_line(0, offset, size, offset, fill="gray50")
+
+    def create_board(self):
+        """Starts over with an empty board of the current size."""
+        self.reset(self.board_size)
+
+    def on_click(self, event):
+        """Maps a click to its cell and forwards it to the callback."""
+        if not self.enabled:
+            return
+        row, col = event.y // self.cell_size, event.x // self.cell_size
+        if 0 <= row < self.board_size and 0 <= col < self.board_size:
+            self.on_click_callback(row, col)
+
+    def update_button(self, row, col, text):
+        """Redraws one cell, and only if its text actually changed."""
+        item = self.cell_items.get((row, col))
+        if item is not None:
+            if item[1] != text:
+                self.canvas.itemconfig(item[0], text=text)
+                self.cell_items[(row, col)] = (item[0], text)
+            return
+        x = col * self.cell_size + self.cell_size // 2
+        y = row * self.cell_size + self.cell_size // 2
+        self.cell_items[(row, col)] = (self.canvas.create_text(x, y, text=text, font=self.font), text)
+
+    def disable_buttons(self):
+        self.enabled = False
+        self.canvas.config(background="gray90")
+
+    def enable_buttons(self):
+        self.enabled = True
+        self.canvas.config(background="white")
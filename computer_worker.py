@@ -0,0 +1,97 @@
+# computer_worker.py
+
+import queue
+import threading
+import time
+
+
+class ComputerMoveWorker:
+    """Chooses computer moves on a background thread so the Tk mainloop never blocks.
+
+    The player searches a snapshot of the game mode, so the GUI can keep
+    using the live one. Each request gets a job number and results come back
+    through a queue that the GUI polls; results of cancelled or superseded
+    jobs are dropped.
+    """
+
+    def __init__(self):
+        self.results = queue.Queue()
+        self.job = 0
+        self.player = None  # Player of the job in flight, if any
+
+    @property
+    def busy(self):
+        """True while a move is being chosen."""
+        return self.player is not None
+
+    def start(self, player, game_mode):
+        """Starts choosing a move for ``player`` on a snapshot of ``game_mode``."""
+        self.cancel()
+        self.job += 1
+        self.player = player
+        thread = threading.Thread(target=self._run, args=(self.job, player, game_mode.snapshot()), daemon=True)
+        thread.start()
+
+    def _run(self, job, player, game_mode):
+        try:
+            self.results.put((job, player.choose_move(game_mode), None))
+        except Exception as error:
+            self.results.put((job, None, error))
+
+    def poll(self):
+        """Returns (player, move) once the current job has finished, else None.
+
+        An exception raised while choosing the move is re-raised here, on the
+        polling (Tk) thread.
+        """
+        while True:
+            try:
+                job, move, error = self.results.get_nowait()
+            except queue.Empty:
+                return None
+            if job == self.job and self.player is not None:
+                player, self.player = self.player, None
+                if error is not None:
+                    raise error
+                return player, move
+
+    def cancel(self):
+        """Abandons the job in flight and asks its player to stop searching."""
+        if self.player is not None:
+            self.player.cancel()
+            self.player = None
+
+
+class MoveBatch:
+    """Stands in for the computer players in fast-forward: one choose_move plays many moves.
+
+    On the worker's snapshot, moves are chosen and applied back to back
+    until ``time_slice`` seconds have passed, the game ends or a colour
+    without an entry in ``players`` is to move. choose_move returns the
+    moves in order, for the GUI thread to replay in one go.
+    """
+
+    def __init__(self, players, time_slice):
+        self.players = players  # color -> ComputerPlayer
+        self.time_slice = time_slice
+        self.cancelled = False
+
+    def choose_move(self, game_mode):
+        moves = []
+        deadline = time.perf_counter() + self.time_slice
+        while game_mode.is_game_active and not self.cancelled:
+            player = self.players.get(game_mode.current_color)
+            if player is None:
+                break
+            move = player.choose_move(game_mode)
+            if move is None or game_mode.make_move(*move)["result"] == "invalid":
+                break
+            moves.append(move)
+            if time.perf_counter() >= deadline:
+                break
+        return moves
+
+    def cancel(self):
+        self.cancelled = True
+        for player in self.players.values():
+            player.cancel()
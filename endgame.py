@@ -0,0 +1,189 @@
+# endgame.py
+#
+# Exact play for the last few empty cells of a board of any size. With k
+# cells left there are at most 3 ** k ways to fill them in (each cell empty,
+# S or O), so the endgame can be searched exhaustively. A position is a pair
+# of bitmasks over the remaining cells, one for the S and one for the O
+# placed since the solver was set up, and every result is memoized under
+# that pair, which keeps the work bounded by 3 ** k positions however the
+# moves are ordered.
+#
+# The filled cells around the remaining ones no longer change, so each SOS a
+# move could complete reduces to a condition on the two masks: which of the
+# remaining cells must hold an S and which an O. As in search.py, values
+# depend only on the letters: the net number of SOS the side to move will
+# still score (General rules, extra turns included) or 1/0/-1 for a win,
+# draw or loss (Simple rules). The score difference so far adds the same
+# amount to every General outcome, so it is left out of the memo key:
+# maximising the net SOS still to come maximises the final margin, which
+# wins whenever a win can be forced.
+#
+# A solve can be given a deadline; when it passes, best_move gives up and
+# returns None so the caller can fall back to its own strategy. Everything
+# memoized so far is exact and is kept, so the next move resumes the work.
+#
+#     solver = EndgameSolver()
+#     move = solver.best_move(mode, deadline)  # mode with a handful of empty cells
+
+import time
+
+from game_modes import SimpleGameMode
+from segments import REQUIRED, SparseSegmentTable
+
+# Empty-cell count below which players that opt in solve positions exactly
+# (at most 3 ** 9 = 19683 positions, well under a second)
+ENDGAME_THRESHOLD = 10
+# Seconds a solve may take by default before the player's strategy takes over
+ENDGAME_TIME_BUDGET = 0.25
+# Positions solved between deadline checks
+CHECK_INTERVAL = 256
+
+
+class EndgameTimeout(Exception):
+    """Raised inside a solve to unwind it once its deadline has passed."""
+
+
+class EndgameSolver:
+    """Plays the last empty cells of a game perfectly by exhaustive, memoized search.
+
+    The memo is kept across moves of the same endgame, so only the first
+    call does real work; a position outside the solved endgame sets the
+    solver up afresh.
+    """
+
+    def __init__(self):
+        self.board_size = None
+        self.simple = None
+        self.cells = ()  # Flat ids of the cells the endgame started with; bit i is cells[i]
+        self.fixed = {}  # Filled cell -> letter, for every filled cell a condition depends on
+        self.conditions = []  # Per remaining cell: ([(S bits, O bits)] for S, the same for O)
+        self.memo = {}
+        self.nodes = 0
+        self.deadline = float("inf")
+        self.last_value = None
+
+    def best_move(self, game_mode, deadline=None):
+        """Returns a best (row, col, letter) for the side to move.
+
+        Among moves of equal value the one scoring the most SOS right away
+        is preferred. The solved value is kept in ``last_value``. Returns
+        None if the board is full or the solve was still running at
+        ``deadline`` (a time.perf_counter() value).
+        """
+        if game_mode.empty_cells.is_full():
+            return None
+        self.deadline = float("inf") if deadline is None else deadline
+        try:
+            return self.solve_root(game_mode)
+        except EndgameTimeout:
+            return None
+
+    def solve_root(self, game_mode):
+        """best_move without the deadline handling."""
+        size = game_mode.board_size
+        simple = isinstance(game_mode, SimpleGameMode)
+        empty = {row * size + col for row, col in game_mode.empty_cells}
+        if not self.covers(game_mode, simple, empty):
+            self.setup(game_mode, simple, empty)
+
+        s_mask = o_mask = 0
+        for index, cell in enumerate(self.cells):
+            if cell not in empty:
+                if game_mode.board.get(*divmod(cell, size)) == 'S':
+                    s_mask |= 1 << index
+                else:
+                    o_mask |= 1 << index
+        best = None
+        for index, letter_bit, gain in self.moves(s_mask, o_mask):
+            if letter_bit:
+                value = self.move_value(s_mask, o_mask | 1 << index, gain)
+            else:
+                value = self.move_value(s_mask | 1 << index, o_mask, gain)
+            if best is None or (value, gain) > best[:2]:
+                best = (value, gain, index, letter_bit)
+        self.last_value, _, index, letter_bit = best
+        row, col = divmod(self.cells[index], size)
+        return row, col, "SO"[letter_bit]
+
+    def covers(self, game_mode, simple, empty):
+        """True if the memo built for an earlier position of this endgame still applies."""
+        if (game_mode.board_size, simple) != (self.board_size, self.simple) or not empty <= set(self.cells):
+            return False
+        size = game_mode.board_size
+        return all(game_mode.board.get(*divmod(cell, size)) == letter for cell, letter in self.fixed.items())
+
+    def setup(self, game_mode, simple, empty):
+        """Reduces every SOS the empty cells could still complete to a condition on the two masks."""
+        size = game_mode.board_size
+        table = SparseSegmentTable(size)
+        self.board_size, self.simple = size, simple
+        self.cells = tuple(sorted(empty))
+        bits = {cell: 1 << index for index, cell in enumerate(self.cells)}
+        self.fixed = {}
+        self.conditions = []
+        self.memo = {}
+        for cell in self.cells:
+            by_letter = ([], [])
+            for segment, position in table.cell_segments[cell]:
+                need_s = need_o = 0
+                for other_position, other in enumerate(table.segments[segment]):
+                    if other == cell:
+                        continue
+                    required = REQUIRED[other_position]
+                    if other in bits:
+                        if required == 'S':
+                            need_s |= bits[other]
+                        else:
+                            need_o |= bits[other]
+                        continue
+                    letter = self.fixed[other] = game_mode.board.get(*divmod(other, size))
+                    if letter != required:
+                        break  # This triple can never spell SOS
+                else:
+                    by_letter[REQUIRED[position] == 'O'].append((need_s, need_o))
+            self.conditions.append(by_letter)
+
+    def moves(self, s_mask, o_mask):
+        """Yields (cell index, letter bit, SOS completed) for every move of a position."""
+        taken = s_mask | o_mask
+        for index, by_letter in enumerate(self.conditions):
+            if taken >> index & 1:
+                continue
+            for letter_bit, conditions in enumerate(by_letter):
+                gain = 0
+                for need_s, need_o in conditions:
+                    if (s_mask & need_s) == need_s and (o_mask & need_o) == need_o:
+                        gain += 1
+                yield index, letter_bit, gain
+
+    def move_value(self, s_mask, o_mask, gain):
+        """Value for the mover of the position reached by a move that completed ``gain`` SOS."""
+        if self.simple:
+            return 1 if gain else -self.solve(s_mask, o_mask)
+        if gain:
+            # Extra turn: the mover moves again, so the child value is not negated
+            return gain + self.solve(s_mask, o_mask)
+        return -self.solve(s_mask, o_mask)
+
+    def solve(self, s_mask, o_mask):
+        """Returns the value of a position for the side to move."""
+        key = s_mask | o_mask << len(self.cells)
+        value = self.memo.get(key)
+        if value is not None:
+            return value
+        self.nodes += 1
+        if self.nodes % CHECK_INTERVAL == 0 and time.perf_counter() > self.deadline:
+            raise EndgameTimeout
+        value = None if (s_mask | o_mask) != (1 << len(self.cells)) - 1 else 0
+        for index, letter_bit, gain in self.moves(s_mask, o_mask):
+            if self.simple and gain:
+                value = 1  # Completing an SOS wins on the spot
+                break
+            if letter_bit:
+                move_value = self.move_value(s_mask, o_mask | 1 << index, gain)
+            else:
+                move_value = self.move_value(s_mask | 1 << index, o_mask, gain)
+            if value is None or move_value > value:
+                value = move_value
+        self.memo[key] = value
+        return value
@@ -0,0 +1,173 @@
+# equivalence.py
+#
+# Equivalence checks between the optimised engine paths and the plain ones
+# they replace. Random games are played move for move on every board backend
+# and compared with ListBoard, the classic list-of-lists board: cell contents,
+# the SOS counted through each placed cell and through trial letters on empty
+# cells, full-board checks, the empty cells and the game results must all
+# agree. Games of the NumPy batch engine are replayed on the game modes, whose
+# check_sos must count the same SOS for every move and whose turns, scores and
+# winners must match. Every check returns a list of mismatch descriptions,
+# empty when the paths agree. Run it after touching the backends or the rules:
+#
+#     python -m equivalence --games 200 --sizes 3 4 7
+
+import argparse
+import importlib.util
+import random
+import sys
+
+from boards import BOARD_BACKENDS
+from simulate import GAME_MODES
+
+REFERENCE_BACKEND = "list"
+# Empty cells per move on which a trial S and O are counted and taken back
+TRIAL_CELLS = 3
+
+
+def compare_boards(reference, board, board_size, label):
+    """Compares every cell, the full-board check and the empty cells of two boards."""
+    problems = []
+    for row in range(board_size):
+        for col in range(board_size):
+            if board.get(row, col) != reference.get(row, col):
+                problems.append(f"{label}: cell ({row}, {col}) holds {board.get(row, col)!r}, "
+                                f"expected {reference.get(row, col)!r}")
+    if board.is_full() != reference.is_full():
+        problems.append(f"{label}: is_full() is {board.is_full()}, expected {reference.is_full()}")
+    if sorted(board.empty_cells()) != sorted(reference.empty_cells()):
+        problems.append(f"{label}: empty cells differ")
+    return problems
+
+
+def compare_trials(reference, board, cells, label):
+    """Compares the SOS an S or an O would form on each empty cell, taking the letters back again."""
+    problems = []
+    for row, col in cells:
+        for letter in "SO":
+            reference.place(row, col, letter)
+            board.place(row, col, letter)
+            expected, counted = reference.count_sos(row, col), board.count_sos(row, col)
+            reference.clear(row, col)
+            board.clear(row, col)
+            if counted != expected:
+                problems.append(f"{label}: trial {letter} at ({row}, {col}) counts {counted} SOS, expected {expected}")
+    if hasattr(board, "completing_masks"):
+        for letter, mask in zip("SO", board.completing_masks()):
+            completing = set()
+            while mask:
+                low = mask & -mask
+                completing.add(board.cell(low.bit_length() - 1))
+                mask ^= low
+            expected = set()
+            for row, col in reference.empty_cells():
+                reference.place(row, col, letter)
+                if reference.count_sos(row, col):
+                    expected.add((row, col))
+                reference.clear(row, col)
+            if completing != expected:
+                problems.append(f"{label}: completing_masks() disagrees for {letter}")
+    return problems
+
+
+def check_board_backends(games, board_size, game_mode="General", seed=None):
+    """Plays random games on every backend side by side and compares each with the reference backend."""
+    rng = random.Random(seed)
+    problems = []
+    for game in range(games):
+        modes = {name: GAME_MODES[game_mode](board_size, backend=name) for name in BOARD_BACKENDS}
+        for mode in modes.values():
+            mode.reset_game(board_size)
+        reference = modes[REFERENCE_BACKEND]
+        while reference.is_game_active and not problems:
+            row, col = rng.choice(reference.board.empty_cells())
+            letter = rng.choice("SO")
+            expected = reference.make_move(row, col, letter)
+            empty = reference.board.empty_cells()
+            trials = rng.sample(empty, min(TRIAL_CELLS, len(empty)))
+            for name, mode in modes.items():
+                if mode is reference:
+                    continue
+                label = f"{game_mode} {board_size}x{board_size} game {game}, {name}"
+                result = mode.make_move(row, col, letter)
+                if result != expected:
+                    problems.append(f"{label}: move ({row}, {col}, {letter}) gave {result}, expected {expected}")
+                problems += compare_boards(reference.board, mode.board, board_size, label)
+                problems += compare_trials(reference.board, mode.board, trials, label)
+                if sorted(mode.empty_cells) != sorted(reference.empty_cells):
+                    problems.append(f"{label}: empty-cell index differs")
+                if getattr(mode, "sos_count", None) != getattr(reference, "sos_count", None):
+                    problems.append(f"{label}: scores {mode.sos_count}, expected {reference.sos_count}")
+        if problems:
+            break
+    return problems
+
+
+def check_batch_engine(games, board_size, game_mode="General", seed=None):
+    """Plays a batch of random games on the NumPy engine and replays every move on a game mode."""
+    # Imported here so the board backend check keeps working without NumPy installed
+    from batch_engine import BLUE, NO_WINNER, RED, S, BatchEngine
+
+    colors = {BLUE: "Blue", RED: "Red", NO_WINNER: None}
+    engine = BatchEngine(games, board_size, game_mode, seed)
+    modes = [GAME_MODES[game_mode](board_size) for _ in range(games)]
+    for mode in modes:
+        mode.reset_game(board_size)
+    problems = []
+    while not engine.done.all() and not problems:
+        batch, rows, cols, letters = engine.random_moves()
+        movers = engine.to_move[batch].tolist()
+        counts = engine.step(batch, rows, cols, letters).tolist()
+        for game, row, col, letter, mover, count in zip(batch.tolist(), rows.tolist(), cols.tolist(),
+                                                        letters.tolist(), movers, counts):
+            mode = modes[game]
+            character = 'S' if letter == S else 'O'
+            label = f"{game_mode} {board_size}x{board_size} batch game {game}, move ({row}, {col}, {character})"
+            if mode.current_color != colors[mover]:
+                problems.append(f"{label}: batch engine moved {colors[mover]}, game mode {mode.current_color}")
+            mode.make_move(row, col, character)
+            if mode.check_sos(row, col) != count:
+                problems.append(f"{label}: batch engine counted {count} SOS, check_sos {mode.check_sos(row, col)}")
+    if problems:
+        return problems
+    for game, mode in enumerate(modes):
+        label = f"{game_mode} {board_size}x{board_size} batch game {game}"
+        if mode.is_game_active:
+            problems.append(f"{label}: game mode still active after the batch engine finished")
+        if mode.winner != colors[int(engine.winner[game])]:
+            problems.append(f"{label}: winner {colors[int(engine.winner[game])]}, game mode {mode.winner}")
+        scores = getattr(mode, "sos_count", None)
+        if scores is not None and [scores["Blue"], scores["Red"]] != engine.scores[game].tolist():
+            problems.append(f"{label}: scores {engine.scores[game].tolist()}, game mode {scores}")
+    return problems
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Check the optimised engine paths against the plain ones.")
+    parser.add_argument("--games", type=int, default=100, help="random games per mode and size")
+    parser.add_argument("--sizes", nargs="+", type=int, default=[3, 4, 7], help="board sizes to play")
+    parser.add_argument("--modes", nargs="+", choices=sorted(GAME_MODES), default=["Simple", "General"],
+                        help="game modes to play")
+    parser.add_argument("--seed", type=int, default=0, help="random seed")
+    args = parser.parse_args(argv)
+
+    checks = [("board backends", check_board_backends)]
+    if importlib.util.find_spec("numpy"):
+        checks.append(("batch engine", check_batch_engine))
+    else:
+        print("batch engine: skipped, NumPy is not installed")
+    failed = False
+    for name, check in checks:
+        for game_mode in args.modes:
+            for board_size in args.sizes:
+                problems = check(args.games, board_size, game_mode, args.seed)
+                print(f"{name}, {game_mode} {board_size}x{board_size}: "
+                      f"{'ok' if not problems else f'{len(problems)} mismatches'}")
+                for problem in problems[:10]:
+                    print(f"  {problem}")
+                failed = failed or bool(problems)
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -31,6 +31,11 @@ class GameBoard:
             self.parent.grid_rowconfigure(i, weight=1)
             self.parent.grid_columnconfigure(i, weight=1)
 
+    def reset(self, board_size):
+        """Rebuilds the buttons for a new game of the given size."""
+        self.board_size = board_size
+        self.create_board()
+
     def update_button(self, row, col, text):
         self.board_buttons[row][col].config(text=text)
 
@@ -38,3 +43,8 @@ class GameBoard:
         for row in self.board_buttons:
             for button in row:
                 button.config(state="disabled")
+
+    def enable_buttons(self):
+        for row in self.board_buttons:
+            for button in row:
+                button.config(state="normal")
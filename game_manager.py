@@ -1,42 +1,82 @@
 # game_manager.py
 
+from boards import default_backend
+from computer_worker import ComputerMoveWorker, MoveBatch
 from game_modes import SimpleGameMode, GeneralGameMode
-from player import HumanPlayer, ComputerPlayer
+from player import HumanPlayer, ComputerPlayer, create_player
+
+# How often the GUI checks the worker for a finished computer move (about 60 Hz)
+POLL_INTERVAL_MS = 16
+
+# Pace name -> (delay before a computer's move, delay before its extra turn), in ms.
+# Fast-forward also plays computer moves in batches and draws once per batch.
+PACES = {
+    "Normal": (1000, 4000),
+    "Fast": (250, 1000),
+    "Instant": (0, 0),
+    "Fast-forward": (0, 0),
+}
+# Seconds of computer moves played per fast-forward batch
+FAST_FORWARD_SLICE = 0.05
 
 
 class GameManager:
-    """Manages the game state, player turns, and game logic for SOS."""
+    """Manages the game state, player turns, and game logic for SOS.
+
+    The GUI is optional: with ``gui=None`` the manager runs headless, which is
+    how simulations and other non-interactive drivers use it.
+    """
 
-    def __init__(self, board_size=3, game_mode="Simple", gui=None):
+    def __init__(self, board_size=3, game_mode="Simple", gui=None, board_backend=None):
         self.board_size = board_size
         self.gui = gui
+        self.board_backend = board_backend  # None picks one by board size (sparse for very large boards)
         self.is_game_active = True
         self.players = {"Blue": None, "Red": None}  # Stores player instances
+        self.current_player = None
+        self.worker = ComputerMoveWorker()
+        self.scheduled_move = None  # Tk after() id of a pending computer turn
+        self.recorder = None  # Optional game_record.GameRecordWriter
+        self.seed = 0  # Stored in game records
+        self.pace = "Normal"
+        self.move_delay_ms, self.extra_turn_delay_ms = PACES[self.pace]
+        self.deferred = None  # GUI updates held back while a fast-forward batch is replayed
         self.set_game_mode(game_mode)
 
     def initialize_players(self, blue_type="Human", red_type="Human"):
-        """Initialize players as human or computer based on GUI selection."""
-        blue_controls = self.gui.blue_controls if blue_type == "Human" else None
-        red_controls = self.gui.red_controls if red_type == "Human" else None
+        """Initialize players as human or computer based on GUI selection.
+
+        Besides "Human" and "Computer", a type can name any registered
+        computer strategy (see player.PLAYER_STRATEGIES).
+        """
+        blue_controls = self.gui.blue_controls if self.gui and blue_type == "Human" else None
+        red_controls = self.gui.red_controls if self.gui and red_type == "Human" else None
 
         # Create HumanPlayer or ComputerPlayer based on type
-        self.players["Blue"] = HumanPlayer("Blue", "Blue", blue_controls) if blue_type == "Human" else ComputerPlayer(
-            "Blue", "Blue")
-        self.players["Red"] = HumanPlayer("Red", "Red", red_controls) if red_type == "Human" else ComputerPlayer("Red",
-                                                                                                                 "Red")
+        self.players["Blue"] = self.create_player(blue_type, "Blue", blue_controls)
+        self.players["Red"] = self.create_player(red_type, "Red", red_controls)
 
         self.current_player = self.players["Blue"]  # Start with Blue player
 
+    def create_player(self, player_type, color, controls=None):
+        """Creates the player for one color from its type name."""
+        if player_type == "Human":
+            return HumanPlayer(color, color, controls)
+        if player_type == "Computer":
+            return ComputerPlayer(color, color)
+        return create_player(player_type, color, color, self.board_size)
+
     def set_game_mode(self, game_mode):
         """Sets the game mode and initializes the appropriate game mode class."""
         self.game_mode = game_mode
+        backend = self.board_backend or default_backend(self.board_size)
         if game_mode == "Simple":
-            self.mode = SimpleGameMode(self.board_size, self)
+            self.mode = SimpleGameMode(self.board_size, self, backend)
             if self.gui:
                 self.gui.blue_score_label.grid_remove()
                 self.gui.red_score_label.grid_remove()
         elif game_mode == "General":
-            self.mode = GeneralGameMode(self.board_size, self)
+            self.mode = GeneralGameMode(self.board_size, self, backend)
             if self.gui:
                 self.gui.blue_score_label.grid()
                 self.gui.red_score_label.grid()
@@ -48,46 +88,207 @@ class GameManager:
 
     def make_move(self, row, col, character):
         """Delegates the move to the game mode and processes the result."""
+        # The position pondered on is about to change; what was found stays in the players' tables
+        self.stop_pondering()
         result = self.mode.make_move(row, col, character)
 
+        if result["result"] == "invalid":
+            self.set_status("Invalid move. Try again.")
+            return result
+
+        if self.recorder:
+            self.recorder.add_move(row, col, character)
+            if result["result"] in ("win", "draw"):
+                scores = getattr(self.mode, "sos_count", {"Blue": 0, "Red": 0})
+                self.recorder.end_game(result["winner"], scores["Blue"], scores["Red"])
+
+        # Update the board display
+        self.update_cell(row, col, character)
+        if self.game_mode == "General" and result["sos"] > 0:
+            self.update_score_display()
+
         # Handle the outcome based on game mode result
-        if result:
-            if result["result"] == "win":
-                self.gui.turn_label.config(text=f"{self.current_player.color} wins!")
-                self.end_game()
-            elif result["result"] == "draw":
-                self.gui.turn_label.config(text="The game is a draw! No SOS was created.")
-                self.end_game()
-            elif result["result"] == "next_turn":
-                self.switch_turn()
-            elif result["result"] == "extra_turn":
-                self.gui.turn_label.config(text=f"{self.current_player.color} gets another turn!")
+        if result["result"] == "win":
+            self.set_status(f"{result['winner']} wins!")
+            self.end_game()
+        elif result["result"] == "draw":
+            if self.game_mode == "Simple":
+                self.set_status("The game is a draw! No SOS was created.")
+            else:
+                self.set_status("The game is a draw!")
+            self.end_game()
+        elif result["result"] == "next_turn":
+            self.switch_turn()
+        elif result["result"] == "extra_turn":
+            self.set_status(
+                f"{self.current_player.color} formed {result['sos']} SOS! They get an extra turn!")
+            # If the current player is a ComputerPlayer, make an extra move automatically
+            self.schedule_computer_move(self.extra_turn_delay_ms)
+        return result
 
     def switch_turn(self):
-        """Switches the turn between players and updates the GUI."""
-        self.current_player = self.players["Red"] if self.current_player == self.players["Blue"] else self.players[
-            "Blue"]
-        self.gui.turn_label.config(text=f"Current turn: {self.current_player.color}")
+        """Hands the turn to the player chosen by the game mode and updates the GUI."""
+        self.current_player = self.players[self.mode.current_color]
+        self.set_status(f"Current turn: {self.current_player.color}")
+        self.schedule_computer_move(self.move_delay_ms)
+
+    def set_pace(self, pace):
+        """Switches to one of PACES, taking effect from the next computer move, even mid-game."""
+        if pace not in PACES:
+            raise ValueError(f"Unknown pace: {pace}")
+        self.pace = pace
+        self.move_delay_ms, self.extra_turn_delay_ms = PACES[pace]
+        if self.scheduled_move is not None:
+            # Don't sit out a long delay scheduled at the old pace
+            self.gui.root.after_cancel(self.scheduled_move)
+            self.scheduled_move = None
+            self.schedule_computer_move(self.move_delay_ms)
+
+    def schedule_computer_move(self, delay_ms):
+        """Schedules the current player's move if it is a ComputerPlayer.
+
+        Headless drivers call ``play_computer_turn`` themselves, so nothing is
+        scheduled without a GUI.
+        """
+        if self.deferred is not None:
+            return  # The fast-forward batch being replayed schedules what comes next
+        if self.gui and isinstance(self.current_player, ComputerPlayer):
+            self.scheduled_move = self.gui.root.after(delay_ms, self.start_computer_turn)
+        elif self.gui:
+            self.start_pondering()
+
+    def play_computer_turn(self):
+        """Lets the current ComputerPlayer move right away if the game is still running."""
+        if self.is_game_active and isinstance(self.current_player, ComputerPlayer):
+            self.current_player.make_move(self.mode)
 
-        if isinstance(self.current_player, ComputerPlayer):
-            self.gui.root.after(1000, lambda: self.current_player.make_move(self.mode))
+    def start_computer_turn(self):
+        """Starts choosing the current ComputerPlayer's move on the background worker."""
+        self.scheduled_move = None
+        if self.is_game_active and isinstance(self.current_player, ComputerPlayer):
+            if self.pace == "Fast-forward":
+                computers = {color: player for color, player in self.players.items()
+                             if isinstance(player, ComputerPlayer)}
+                self.worker.start(MoveBatch(computers, FAST_FORWARD_SLICE), self.mode)
+            else:
+                self.worker.start(self.current_player, self.mode)
+            self.gui.root.after(POLL_INTERVAL_MS, self.poll_computer_move)
+        else:
+            self.start_pondering()
+
+    def poll_computer_move(self):
+        """Applies the worker's move once it is ready; keeps polling until then."""
+        if not self.worker.busy:
+            return  # Cancelled
+        result = self.worker.poll()
+        if result is None:
+            self.gui.root.after(POLL_INTERVAL_MS, self.poll_computer_move)
+            return
+        player, move = result
+        if isinstance(player, MoveBatch):
+            self.play_move_batch(move)
+        elif move and self.is_game_active and player is self.current_player:
+            row, col, player.choice = move
+            self.make_move(row, col, player.choice)
+
+    def play_move_batch(self, moves):
+        """Replays a fast-forward batch of computer moves, then draws only the position it ends in."""
+        if not moves:
+            return
+        self.deferred = {"cells": {}, "status": None, "scores": False}
+        try:
+            for row, col, character in moves:
+                if not self.is_game_active or not isinstance(self.current_player, ComputerPlayer):
+                    break
+                self.current_player.choice = character
+                if self.make_move(row, col, character)["result"] == "invalid":
+                    break
+        finally:
+            deferred, self.deferred = self.deferred, None
+        for (row, col), character in deferred["cells"].items():
+            self.gui.board.update_button(row, col, character)
+        if deferred["scores"]:
+            self.update_score_display()
+        if deferred["status"] is not None:
+            self.set_status(deferred["status"])
+        if self.is_game_active:
+            self.schedule_computer_move(self.move_delay_ms)
+
+    def cancel_computer_turn(self):
+        """Drops any scheduled or in-flight computer move and stops pondering."""
+        if self.scheduled_move is not None:
+            self.gui.root.after_cancel(self.scheduled_move)
+            self.scheduled_move = None
+        self.worker.cancel()
+        self.stop_pondering()
+
+    def start_pondering(self):
+        """Lets computer players think on a human player's time, in the background."""
+        if self.is_game_active and isinstance(self.current_player, HumanPlayer):
+            for player in self.players.values():
+                if isinstance(player, ComputerPlayer):
+                    player.ponder(self.mode)
+
+    def stop_pondering(self):
+        for player in self.players.values():
+            if isinstance(player, ComputerPlayer):
+                player.stop_pondering()
+
+    def close_players(self):
+        """Releases what computer players keep between moves, such as MCTS worker pools."""
+        for player in self.players.values():
+            if isinstance(player, ComputerPlayer):
+                player.close()
+
+    def update_cell(self, row, col, character):
+        """Draws a placed letter on the board when a GUI is attached."""
+        if self.deferred is not None:
+            self.deferred["cells"][(row, col)] = character
+        elif self.gui:
+            self.gui.board.update_button(row, col, character)
+
+    def set_status(self, text):
+        """Shows a status message on the turn label when a GUI is attached."""
+        if self.deferred is not None:
+            self.deferred["status"] = text
+        elif self.gui:
+            self.gui.turn_label.config(text=text)
+
+    def update_score_display(self):
+        """Updates the SOS count labels."""
+        if self.deferred is not None:
+            self.deferred["scores"] = True
+        elif self.gui:
+            self.gui.blue_score_label.config(text=f"Blue SOS: {self.mode.sos_count['Blue']}")
+            self.gui.red_score_label.config(text=f"Red SOS: {self.mode.sos_count['Red']}")
 
     def reset_game(self, board_size, game_mode, blue_type="Human", red_type="Human"):
         """Resets the game with a new board size, game mode, and player types."""
+        self.cancel_computer_turn()
+        self.close_players()  # The players are replaced below
         self.board_size = board_size
+        self.is_game_active = True
         self.set_game_mode(game_mode)
         self.initialize_players(blue_type, red_type)  # Initialize players based on GUI selection
         self.mode.reset_game(board_size)  # Reset the game mode-specific logic
         self.current_player = self.players["Blue"]  # Start with Blue player
+        if self.recorder:
+            self.recorder.begin_game(board_size, game_mode, blue_type, red_type, self.seed)
+        if self.game_mode == "General":
+            self.update_score_display()
 
     def end_game(self):
         """Ends the game by disabling interactions and setting the game state."""
         self.is_game_active = False
         self.mode.is_game_active = False
-        self.gui.board.disable_buttons()
+        self.cancel_computer_turn()
+        self.close_players()
+        if self.recorder:
+            # Only games stopped before a result are still open here
+            self.recorder.abandon_game()
+        if self.gui and self.gui.board:
+            self.gui.board.disable_buttons()
 
     def is_board_full(self):
         """Checks if the entire board is filled."""
-        return all(cell != ' ' for row in self.mode.board for cell in row)
-
-
+        return self.mode.is_board_full()
@@ -1,100 +1,167 @@
 # game_modes.py
+#
+# The game modes are the GUI-free engine core: they own the board, validate
+# and apply moves, detect SOS patterns, keep score and decide whose turn it is.
+# They never touch tkinter; every move returns a result dictionary that the
+# GameManager (or a headless driver such as simulate.py) acts upon. The board
+# itself is one of the backends from boards.py, selected by name.
+
+import copy
+from collections import namedtuple
+
+from boards import make_board, make_empty_cells
+from segments import make_segment_tracker
+from symmetry import SymmetricHash
+
+
+# What BaseGameMode.undo needs to take back a move made with apply: the flat
+# cell index (row * size + col), the letter, the SOS it formed, the points it
+# added to the mover's score and whether the turn passed to the other player
+UndoRecord = namedtuple("UndoRecord", "cell letter sos score_delta turn_passes")
+
+
+def other_color(color):
+    """Returns the opposing player's color."""
+    return "Red" if color == "Blue" else "Blue"
 
-from player import ComputerPlayer
 
 class BaseGameMode:
     """Base class for common game mode functionality."""
 
-    def __init__(self, board_size, game_manager):
+    def __init__(self, board_size, game_manager=None, backend="list", track_segments=True, track_symmetry=False):
         self.board_size = board_size
-        self.board = [[' ' for _ in range(board_size)] for _ in range(board_size)]
+        self.backend = backend
+        self.track_segments = track_segments
+        self.track_symmetry = track_symmetry
+        self.board = make_board(board_size, backend)
+        self.empty_cells = make_empty_cells(board_size, backend)
+        # SOS segment state for strategies; random-only simulations can switch it off
+        self.segments = make_segment_tracker(board_size, backend) if track_segments else None
+        # Hashes of the 8 symmetric images, for callers keying caches on the canonical
+        # position; off by default, as the searches hash their own SearchState
+        self.symmetry = SymmetricHash(board_size) if track_symmetry else None
         self.game_manager = game_manager
         self.is_game_active = False
+        self.current_color = "Blue"
+        self.winner = None
 
     def reset_game(self, board_size):
         """Resets the board and game state."""
         self.board_size = board_size
-        self.board = [[' ' for _ in range(board_size)] for _ in range(board_size)]
+        self.board = make_board(board_size, self.backend)
+        self.empty_cells = make_empty_cells(board_size, self.backend)
+        self.segments = make_segment_tracker(board_size, self.backend) if self.track_segments else None
+        self.symmetry = SymmetricHash(board_size) if self.track_symmetry else None
         self.is_game_active = True
-
-    def make_move(self, row, col, character):
-        """Attempt a move in the base mode."""
-        if self.board[row][col] != ' ':
+        self.current_color = "Blue"
+        self.winner = None
+
+    def snapshot(self):
+        """Returns a GUI-free copy of the current position, safe to search on another thread."""
+        clone = copy.copy(self)
+        clone.game_manager = None
+        clone.board = copy.deepcopy(self.board)
+        clone.empty_cells = copy.deepcopy(self.empty_cells)
+        clone.segments = self.segments.copy() if self.segments is not None else None
+        clone.symmetry = self.symmetry.copy() if self.symmetry is not None else None
+        return clone
+
+    def place_character(self, row, col, character):
+        """Places a character on the board; returns False if the cell is occupied."""
+        if self.board.get(row, col) != ' ':
             return False  # Invalid move if cell is already occupied
-        self.board[row][col] = character
+        self.board.place(row, col, character)
+        self.empty_cells.remove(row, col)
+        if self.segments is not None:
+            self.segments.place(row * self.board_size + col, character)
+        if self.symmetry is not None:
+            self.symmetry.toggle(row * self.board_size + col, character)
         return True
 
+    def make_move(self, row, col, character):
+        """Applies a move and returns a result dictionary describing its outcome."""
+        if not self.is_valid_position(row, col) or not self.place_character(row, col, character):
+            return {"result": "invalid", "sos": 0, "winner": None}
+        return self.resolve_move(row, col, self.check_sos(row, col))
+
+    def resolve_move(self, row, col, sos_formed):
+        """Decides the outcome of a placed move. Specific to each subclass."""
+        raise NotImplementedError("Subclasses should implement this method.")
+
+    def score_delta(self, sos_formed):
+        """Points a move forming ``sos_formed`` SOS adds to the mover's score."""
+        return 0
+
+    def apply(self, row, col, character):
+        """Makes a move in place for lookahead and returns its UndoRecord, or None if it is not legal.
+
+        The board, empty-cell index and segment tracker are updated
+        incrementally, so a move and its undo never copy the board.
+        """
+        if not self.is_game_active or not self.is_valid_position(row, col) \
+                or not self.place_character(row, col, character):
+            return None
+        mover = self.current_color
+        sos_formed = self.check_sos(row, col)
+        self.resolve_move(row, col, sos_formed)
+        return UndoRecord(row * self.board_size + col, character, sos_formed, self.score_delta(sos_formed),
+                          self.current_color != mover)
+
+    def undo(self, record):
+        """Takes back the last move made with ``apply``, restoring turn, scores and an active game."""
+        row, col = divmod(record.cell, self.board_size)
+        self.board.clear(row, col)
+        self.empty_cells.add(row, col)
+        if self.segments is not None:
+            self.segments.remove(record.cell)
+        if self.symmetry is not None:
+            self.symmetry.toggle(record.cell, record.letter)
+        if record.turn_passes:
+            self.current_color = other_color(self.current_color)
+        self.is_game_active = True
+        self.winner = None
+
     def check_sos(self, row, col):
         """Counts the number of SOS patterns created around the given row, col position."""
-        directions = [
-            (0, 1),  # Horizontal
-            (1, 0),  # Vertical
-            (1, 1),  # Diagonal top-left to bottom-right
-            (1, -1)  # Diagonal top-right to bottom-left
-        ]
-
-        sos_count = 0
-        for dx, dy in directions:
-            sos_count += self.is_sos_sequence(row - 2 * dx, col - 2 * dy, row - dx, col - dy, row, col)
-            sos_count += self.is_sos_sequence(row - dx, col - dy, row, col, row + dx, col + dy)
-            sos_count += self.is_sos_sequence(row, col, row + dx, col + dy, row + 2 * dx, col + 2 * dy)
-        return sos_count
-
-    def is_sos_sequence(self, x1, y1, x2, y2, x3, y3):
-        """Helper method to check for 'S-O-S' sequence in given positions."""
-        if self.is_valid_position(x1, y1) and self.is_valid_position(x2, y2) and self.is_valid_position(x3, y3):
-            if self.board[x1][y1] == 'S' and self.board[x2][y2] == 'O' and self.board[x3][y3] == 'S':
-                return 1
-        return 0
+        return self.board.count_sos(row, col)
 
     def is_valid_position(self, row, col):
         """Checks if the given position is within the board boundaries."""
         return 0 <= row < self.board_size and 0 <= col < self.board_size
 
-    def end_game_with_draw(self):
-        """Handle game draw scenario."""
-        self.game_manager.gui.turn_label.config(text="The game is a draw!")
-        self.game_manager.end_game()
+    def is_board_full(self):
+        """Checks if the entire board is filled."""
+        return self.empty_cells.is_full()
 
+    def end_game(self, winner=None):
+        """Marks the game as finished with the given winner (None for a draw)."""
+        self.is_game_active = False
+        self.winner = winner
+        return {"result": "win" if winner else "draw", "winner": winner}
 
 
 class SimpleGameMode(BaseGameMode):
     """Implements the simple game mode where the first SOS wins."""
 
-    def make_move(self, row, col, character):
-        if not super().make_move(row, col, character):
-            # Invalid move feedback
-            self.game_manager.gui.turn_label.config(text="Invalid move. Try again.")
-            return
-
-        # Update the board display
-        self.game_manager.gui.board.update_button(row, col, character)
-
+    def resolve_move(self, row, col, sos_formed):
         # Check for win or draw conditions
-        if self.check_sos(row, col) > 0:
-            self.end_game_with_winner()
-        elif self.game_manager.is_board_full():
-            self.end_game_with_draw()
+        if sos_formed > 0:
+            outcome = self.end_game(self.current_color)
+        elif self.is_board_full():
+            outcome = self.end_game()
         else:
             # Switch turn for next player
-            self.game_manager.switch_turn()
-
-    def end_game_with_winner(self):
-        """Declare the current player as winner and end the game."""
-        self.game_manager.gui.turn_label.config(text=f"{self.game_manager.current_player.color} wins!")
-        self.game_manager.end_game()
-
-    def end_game_with_draw(self):
-        """Handle game draw scenario."""
-        self.game_manager.gui.turn_label.config(text="The game is a draw! No SOS was created.")
-        self.game_manager.end_game()
+            self.current_color = other_color(self.current_color)
+            outcome = {"result": "next_turn", "winner": None}
+        outcome["sos"] = sos_formed
+        return outcome
 
 
 class GeneralGameMode(BaseGameMode):
     """Implements the general game mode where SOS counts determine the winner."""
 
-    def __init__(self, board_size, game_manager):
-        super().__init__(board_size, game_manager)
+    def __init__(self, board_size, game_manager=None, backend="list", track_segments=True, track_symmetry=False):
+        super().__init__(board_size, game_manager, backend, track_segments, track_symmetry)
         self.sos_count = {"Blue": 0, "Red": 0}
 
     def reset_game(self, board_size):
@@ -102,76 +169,41 @@ class GeneralGameMode(BaseGameMode):
         super().reset_game(board_size)
         # Reset SOS count for both players
         self.sos_count = {"Blue": 0, "Red": 0}
-        self.update_score_display()
 
-    def update_score_display(self):
-        """Updates the SOS count labels."""
-        self.game_manager.gui.blue_score_label.config(text=f"Blue SOS: {self.sos_count['Blue']}")
-        self.game_manager.gui.red_score_label.config(text=f"Red SOS: {self.sos_count['Red']}")
+    def snapshot(self):
+        clone = super().snapshot()
+        clone.sos_count = dict(self.sos_count)
+        return clone
 
-    def make_move(self, row, col, character):
-        if not super().make_move(row, col, character):
-            # Invalid move feedback
-            self.game_manager.gui.turn_label.config(text="Invalid move. Try again.")
-            return
+    def score_delta(self, sos_formed):
+        return sos_formed
 
-        # Update the board display
-        self.game_manager.gui.board.update_button(row, col, character)
+    def undo(self, record):
+        super().undo(record)
+        self.sos_count[self.current_color] -= record.score_delta
 
-        # Check for SOS formations
-        sos_formed = self.check_sos(row, col)
+    def resolve_move(self, row, col, sos_formed):
         if sos_formed > 0:
-            player_color = self.game_manager.current_player.color
-            self.sos_count[player_color] += sos_formed
-            self.update_score_display()
-
-            # If the board is full after the SOS, end the game immediately
-            if self.game_manager.is_board_full():
-                self.end_game_based_on_score()
-                return
-
-            # Display extra turn message for SOS formation
-            self.game_manager.gui.turn_label.config(
-                text=f"{self.game_manager.current_player.color} formed {sos_formed} SOS! They get an extra turn!"
-            )
-
-            # If the current player is a ComputerPlayer, make an extra move automatically
-            if isinstance(self.game_manager.current_player, ComputerPlayer):
-                self.game_manager.gui.root.after(4000, lambda: self.game_manager.current_player.make_move(self))
-                return  # Exit here to let the delayed move take effect
-            else:
-                # For HumanPlayer, allow them to take the extra turn manually (do not switch turn)
-                return
-
-                # Check for game end conditions
-        if self.game_manager.is_board_full():
-            self.end_game_based_on_score()
+            self.sos_count[self.current_color] += sos_formed
+
+        # Check for game end conditions
+        if self.is_board_full():
+            outcome = self.end_game_based_on_score()
+        elif sos_formed > 0:
+            # Forming an SOS grants the same player an extra turn
+            outcome = {"result": "extra_turn", "winner": None}
         else:
             # Switch turn for next player
-            self.game_manager.switch_turn()
-
-    def update_score_display(self):
-        """Updates the SOS count labels."""
-        self.game_manager.gui.blue_score_label.config(text=f"Blue SOS: {self.sos_count['Blue']}")
-        self.game_manager.gui.red_score_label.config(text=f"Red SOS: {self.sos_count['Red']}")
-
-    def handle_extra_turn(self, sos_formed):
-        """Notify player of an extra turn for forming SOS."""
-        self.game_manager.gui.turn_label.config(
-            text=f"{self.game_manager.current_player.color} formed {sos_formed} SOS! They get an extra turn!"
-        )
-
-        # If the current player is a ComputerPlayer, make the move automatically
-        self.extra_turn = True
+            self.current_color = other_color(self.current_color)
+            outcome = {"result": "next_turn", "winner": None}
+        outcome["sos"] = sos_formed
+        return outcome
 
     def end_game_based_on_score(self):
         """Determine winner based on SOS count or declare a draw."""
         blue_score, red_score = self.sos_count["Blue"], self.sos_count["Red"]
         if blue_score > red_score:
-            self.game_manager.gui.turn_label.config(text="Blue wins!")
+            return self.end_game("Blue")
         elif red_score > blue_score:
-            self.game_manager.gui.turn_label.config(text="Red wins!")
-        else:
-            self.end_game_with_draw()  # Draw handled in BaseGameMode
-        self.game_manager.end_game()
-
+            return self.end_game("Red")
+        return self.end_game()
@@ -0,0 +1,297 @@
+# game_record.py
+#
+# Compact binary archive of finished games.
+#
+# A record file is a plain concatenation of game records, each a fixed-size
+# header followed by two bytes per move:
+#
+#   header  magic b"SG", board size, mode, result, seed, final Blue and Red
+#           scores, move count and the two player names (see HEADER)
+#   move    little-endian uint16: cell index (row * size + col) << 1 | letter
+#           bit (0 = S, 1 = O)
+#
+# GameRecordWriter writes a game's header when the game begins and appends
+# every move as it is made; the result, scores and move count are patched
+# into the header when the game ends. Until then the move count is
+# OPEN_COUNT, so a game cut short by a crash keeps the moves that reached
+# the disk: readers take them up to the end of the file, and a writer
+# reopening the file closes the game off as unfinished before appending.
+# GameRecordReader memory-maps a file and offers iteration and random
+# access without building Python objects for games that are not looked at.
+# ``replay`` re-runs a record through the game modes and checks that it
+# reproduces the stored result.
+#
+#     python -m game_record info games.sosr
+#     python -m game_record verify games.sosr
+
+import argparse
+import mmap
+import os
+import struct
+import sys
+from array import array
+from collections import namedtuple
+
+from game_modes import SimpleGameMode, GeneralGameMode
+
+MAGIC = b"SG"
+# magic, board size, mode, result, seed, Blue score, Red score, move count, Blue player, Red player
+HEADER = struct.Struct("<2sHBBQHHI12s12s")
+MOVE = struct.Struct("<H")
+# Byte offsets of the board size and move count fields inside a header
+SIZE_OFFSET = 2
+COUNT_OFFSET = struct.calcsize("<2sHBBQHH")
+MAX_CELLS = 1 << 15
+# Move count of a game whose header has not been patched yet
+OPEN_COUNT = 0xFFFFFFFF
+
+MODES = ("Simple", "General")
+RESULTS = ("Draw", "Blue", "Red", "Unfinished")
+
+RecordHeader = namedtuple("RecordHeader", "board_size game_mode result seed blue_score red_score "
+                                          "move_count blue_player red_player")
+
+
+def encode_move(board_size, row, col, letter):
+    """Packs a move into its 16-bit code."""
+    return (row * board_size + col) << 1 | (letter == 'O')
+
+
+def decode_move(board_size, code):
+    """Unpacks a 16-bit move code into (row, col, letter)."""
+    row, col = divmod(code >> 1, board_size)
+    return row, col, "SO"[code & 1]
+
+
+class GameRecordWriter:
+    """Append-only writer: writes a game's header as it begins and each move as it is made.
+
+    Moves are flushed to the file one by one unless ``flush_moves`` is
+    False; bulk writers such as the simulator then leave it to the buffer.
+    """
+
+    def __init__(self, path, flush_moves=True):
+        try:
+            self.file = open(path, "r+b")
+        except FileNotFoundError:
+            self.file = open(path, "w+b")
+        self.flush_moves = flush_moves
+        self.game = None
+        self.header_offset = None
+        self.move_count = 0
+        self.repair(path)
+        self.file.seek(0, os.SEEK_END)
+
+    def repair(self, path):
+        """Closes off a last game left open by a writer that never finished it."""
+        with GameRecordReader(path) as reader:
+            end = reader.end
+            offset = reader.offsets[-1] if reader.trailing_moves is not None else None
+            move_count = reader.trailing_moves
+        if offset is not None:
+            self.file.seek(offset + COUNT_OFFSET)
+            self.file.write(struct.pack("<I", move_count))
+        self.file.truncate(end)
+
+    def begin_game(self, board_size, game_mode, blue_player="", red_player="", seed=0):
+        """Starts recording a new game; one still open is closed off as unfinished."""
+        if board_size * board_size > MAX_CELLS:
+            raise ValueError(f"Board size {board_size} is too large for the record format")
+        self.abandon_game()
+        self.game = (board_size, MODES.index(game_mode), seed, blue_player, red_player)
+        self.header_offset = self.file.tell()
+        self.move_count = 0
+        self.write_header(RESULTS.index("Unfinished"), 0, 0, OPEN_COUNT)
+
+    def add_move(self, row, col, letter):
+        """Appends one applied move of the current game."""
+        if self.game is not None:
+            self.file.write(MOVE.pack(encode_move(self.game[0], row, col, letter)))
+            self.move_count += 1
+            if self.flush_moves:
+                self.file.flush()
+
+    def end_game(self, winner, blue_score=0, red_score=0):
+        """Patches the current game's result (winner color, or None for a draw) into its header."""
+        if self.game is not None:
+            self.finish(RESULTS.index(winner) if winner else 0, blue_score, red_score)
+
+    def abandon_game(self):
+        """Closes off the current game as unfinished."""
+        if self.game is not None:
+            self.finish(RESULTS.index("Unfinished"), 0, 0)
+
+    def finish(self, result, blue_score, red_score):
+        end = self.file.tell()
+        self.file.seek(self.header_offset)
+        self.write_header(result, blue_score, red_score, self.move_count)
+        self.file.seek(end)
+        self.game = None
+
+    def write_header(self, result, blue_score, red_score, move_count):
+        board_size, mode, seed, blue_player, red_player = self.game
+        self.file.write(HEADER.pack(MAGIC, board_size, mode, result, seed & 0xFFFFFFFFFFFFFFFF,
+                                    blue_score, red_score, move_count,
+                                    blue_player.encode("ascii", "replace")[:12],
+                                    red_player.encode("ascii", "replace")[:12]))
+
+    def flush(self):
+        self.file.flush()
+
+    def close(self):
+        self.abandon_game()
+        self.file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+class GameRecordReader:
+    """Memory-mapped reader with random access to every game in a record file.
+
+    Opening a file scans the headers once to build a compact array of record
+    offsets; move data is only decoded for the games that are asked for. A
+    last game that was still being written when the file was read, or whose
+    writer crashed, holds the moves found up to the end of the file; its
+    count is kept in ``trailing_moves`` (None when every game is complete).
+    """
+
+    def __init__(self, path):
+        self.file = open(path, "rb")
+        try:
+            self.data = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            self.data = b""  # Empty files cannot be mapped
+        self.offsets = array("Q")
+        self.trailing_moves = None
+        offset = 0
+        while offset + HEADER.size <= len(self.data):
+            if self.data[offset:offset + 2] != MAGIC:
+                raise ValueError(f"Corrupt game record at byte {offset}")
+            self.offsets.append(offset)
+            move_count = struct.unpack_from("<I", self.data, offset + COUNT_OFFSET)[0]
+            available = (len(self.data) - offset - HEADER.size) // MOVE.size
+            if move_count == OPEN_COUNT or move_count > available:
+                self.trailing_moves = available
+                move_count = available
+            offset += HEADER.size + MOVE.size * move_count
+            if self.trailing_moves is not None:
+                break
+        # End of the complete records; anything after it is a header or move cut short
+        self.end = offset
+
+    def __len__(self):
+        return len(self.offsets)
+
+    def move_count(self, index):
+        """Returns the number of moves recorded for game ``index``."""
+        if self.trailing_moves is not None and index in (-1, len(self.offsets) - 1):
+            return self.trailing_moves
+        return struct.unpack_from("<I", self.data, self.offsets[index] + COUNT_OFFSET)[0]
+
+    def header(self, index):
+        """Returns the RecordHeader of game ``index``."""
+        (_, board_size, mode, result, seed, blue_score, red_score, _,
+         blue_player, red_player) = HEADER.unpack_from(self.data, self.offsets[index])
+        move_count = self.move_count(index)
+        return RecordHeader(board_size, MODES[mode], RESULTS[result], seed, blue_score, red_score, move_count,
+                            blue_player.rstrip(b"\0").decode("ascii"), red_player.rstrip(b"\0").decode("ascii"))
+
+    def move_codes(self, index):
+        """Returns the raw 16-bit move codes of game ``index`` as a zero-copy memoryview."""
+        offset = self.offsets[index] + HEADER.size
+        move_count = self.move_count(index)
+        return memoryview(self.data)[offset:offset + MOVE.size * move_count].cast("H")
+
+    def moves(self, index):
+        """Yields the (row, col, letter) moves of game ``index``."""
+        board_size = struct.unpack_from("<H", self.data, self.offsets[index] + SIZE_OFFSET)[0]
+        codes = self.move_codes(index)
+        if sys.byteorder != "little":
+            codes = array("H", codes)
+            codes.byteswap()
+        for code in codes:
+            yield decode_move(board_size, code)
+
+    def __getitem__(self, index):
+        return self.header(index)
+
+    def __iter__(self):
+        return (self.header(index) for index in range(len(self)))
+
+    def close(self):
+        if isinstance(self.data, mmap.mmap):
+            self.data.close()
+        self.file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+def replay(reader, index):
+    """Re-runs game ``index`` through the game modes.
+
+    Returns a list of problems found (empty when the record checks out).
+    """
+    header = reader.header(index)
+    mode = (SimpleGameMode if header.game_mode == "Simple" else GeneralGameMode)(header.board_size)
+    mode.reset_game(header.board_size)
+    problems = []
+    for number, (row, col, letter) in enumerate(reader.moves(index), 1):
+        if not mode.is_game_active:
+            problems.append(f"move {number} played after the game ended")
+            break
+        if mode.make_move(row, col, letter)["result"] == "invalid":
+            problems.append(f"move {number} ({row}, {col}, {letter}) is invalid")
+            break
+    if header.result == "Unfinished":
+        return problems
+    if mode.is_game_active:
+        problems.append("game did not finish")
+    elif (mode.winner or "Draw") != header.result:
+        problems.append(f"result is {mode.winner or 'Draw'}, record says {header.result}")
+    if header.game_mode == "General":
+        scores = (mode.sos_count["Blue"], mode.sos_count["Red"])
+        if scores != (header.blue_score, header.red_score):
+            problems.append(f"scores are {scores}, record says {(header.blue_score, header.red_score)}")
+    return problems
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Inspect and verify SOS game record files.")
+    parser.add_argument("command", choices=["info", "verify"])
+    parser.add_argument("path")
+    args = parser.parse_args(argv)
+
+    with GameRecordReader(args.path) as reader:
+        if args.command == "info":
+            results = {}
+            moves = 0
+            for header in reader:
+                results[header.result] = results.get(header.result, 0) + 1
+                moves += header.move_count
+            print(f"{len(reader)} games, {moves} moves")
+            if reader.trailing_moves is not None:
+                print("  the last game was cut short")
+            for result, count in sorted(results.items()):
+                print(f"  {result}: {count}")
+            return 0
+
+        failures = 0
+        for index in range(len(reader)):
+            problems = replay(reader, index)
+            if problems:
+                failures += 1
+                print(f"game {index}: " + "; ".join(problems))
+        print(f"{len(reader) - failures}/{len(reader)} games verified")
+        return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
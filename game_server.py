@@ -0,0 +1,419 @@
+# game_server.py
+#
+# asyncio server hosting many concurrent SOS games in one process, without
+# tkinter. Clients speak newline-delimited JSON over TCP or a Unix socket:
+# every request is one JSON object on one line and gets one JSON line back.
+# Requests may carry an "id", which is echoed in the response; requests are
+# handled concurrently, so responses on a connection can arrive out of order.
+#
+#   {"op": "create", "size": 3, "mode": "Simple", "blue": "Human", "red": "Greedy"}
+#   {"op": "move", "game": 1, "row": 0, "col": 2, "letter": "S"}
+#   {"op": "state", "game": 1, "since": 0}
+#   {"op": "resign", "game": 1, "color": "Blue"}
+#
+# Players are "Human" (moves come from the client) or a computer strategy
+# ("Computer" or any name in player.PLAYER_STRATEGIES). After a create or
+# move request, computer players move until a human is to move or the game
+# is over. Their moves are chosen on a snapshot of the position, off the
+# event loop: quick strategies in a thread pool, the search strategies
+# (AlphaBeta, Anytime, MCTS, Tablebase) in a small process pool, where they
+# cannot hold the GIL against other sessions. Each search process keeps one
+# player per strategy and color, with its transposition table, for all games.
+# Successful responses are {"ok": true, "state": ..., "moves": [[row, col,
+# letter, color], ...]} listing the moves applied by the request; failures
+# are {"ok": false, "error": "..."}. A connection's games are dropped when
+# it closes.
+#
+# The state never carries the board itself, which would cost O(n * n) per
+# response on large boards. Clients rebuild it from the moves: a state
+# request lists every move made after the first "since" moves (all of them
+# by default), and create and move responses list the moves they applied.
+#
+#     python -m game_server serve --port 8765
+#     python -m game_server serve --unix /tmp/sos.sock
+#     python -m game_server load --games 1000 --size 5 --opponent Random
+
+import argparse
+import asyncio
+import itertools
+import json
+import os
+import random
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+from boards import MAX_BOARD_SIZE, default_backend, make_empty_cells
+from game_manager import GameManager
+from game_modes import other_color
+from player import HumanPlayer, create_player
+
+
+class ProtocolError(Exception):
+    """A request that cannot be served; its message is sent back to the client."""
+
+
+# Search players of this process, by (strategy, color); only used in search worker processes
+search_players = {}
+
+
+def search_move(strategy, color, game_mode):
+    """Chooses a move in a search worker process with the process's own player for the strategy."""
+    player = search_players.get((strategy, color))
+    if player is None:
+        player = search_players[strategy, color] = create_player(strategy, color, color)
+    return player.choose_move(game_mode)
+
+
+class GameSession:
+    """One hosted game: a headless GameManager plus a lock that keeps its moves in order."""
+
+    def __init__(self, game_id, board_size, game_mode, blue_type, red_type):
+        self.game_id = game_id
+        self.manager = GameManager(board_size, game_mode)
+        self.manager.reset_game(board_size, game_mode, blue_type, red_type)
+        self.player_types = {"Blue": blue_type, "Red": red_type}
+        self.history = []  # [row, col, letter, color] of every move, in order
+        self.lock = asyncio.Lock()
+
+    def state(self):
+        """Returns the JSON-ready state of the game, without the board (see moves_since)."""
+        mode = self.manager.mode
+        scores = getattr(mode, "sos_count", {"Blue": 0, "Red": 0})
+        return {
+            "game": self.game_id,
+            "size": mode.board_size,
+            "mode": self.manager.game_mode,
+            "turn": mode.current_color,
+            "active": mode.is_game_active,
+            "winner": mode.winner,
+            "scores": dict(scores),
+            "moves": len(self.history),
+            "players": self.player_types,
+        }
+
+    def apply(self, row, col, letter, applied):
+        """Makes one move through the GameManager and appends it to ``applied``."""
+        color = self.manager.mode.current_color
+        result = self.manager.make_move(row, col, letter)
+        if result["result"] == "invalid":
+            raise ProtocolError(f"Invalid move ({row}, {col}, {letter})")
+        self.history.append([row, col, letter, color])
+        applied.append([row, col, letter, color])
+
+    def moves_since(self, since):
+        """Returns the moves made after the first ``since`` ones; replaying them rebuilds the board."""
+        return self.history[since:]
+
+    async def play_computers(self, executors, applied):
+        """Lets computer players move until a human is to move or the game ends.
+
+        ``executors`` maps "quick" and "search" to the pools computer moves run on.
+        """
+        loop = asyncio.get_running_loop()
+        while self.manager.mode.is_game_active:
+            color = self.manager.mode.current_color
+            player = self.manager.players[color]
+            if isinstance(player, HumanPlayer):
+                return
+            snapshot = self.manager.mode.snapshot()
+            if player.max_board_size is None:
+                move = await loop.run_in_executor(executors["quick"], player.choose_move, snapshot)
+            else:
+                # Strategies limited to small boards are the tree searches
+                move = await loop.run_in_executor(executors["search"], search_move,
+                                                  self.player_types[color], color, snapshot)
+            if move is None:
+                return
+            self.apply(*move, applied)
+
+    async def human_move(self, row, col, letter, executors):
+        async with self.lock:
+            mode = self.manager.mode
+            if not mode.is_game_active:
+                raise ProtocolError("The game is over")
+            if not isinstance(self.manager.players[mode.current_color], HumanPlayer):
+                raise ProtocolError(f"It is not a human player's turn ({mode.current_color} is a computer)")
+            applied = []
+            self.apply(row, col, letter, applied)
+            await self.play_computers(executors, applied)
+            return applied
+
+    async def resign(self, color):
+        async with self.lock:
+            mode = self.manager.mode
+            if not mode.is_game_active:
+                raise ProtocolError("The game is over")
+            self.manager.end_game()
+            mode.winner = other_color(color or mode.current_color)
+
+
+class GameServer:
+    """Routes protocol requests to GameSessions."""
+
+    def __init__(self, workers=4, search_workers=1):
+        self.sessions = {}
+        self.next_id = itertools.count(1)
+        self.executors = {
+            "quick": ThreadPoolExecutor(max_workers=workers),
+            # Spawned, like the MCTS pools, rather than forked from a process running threads
+            "search": ProcessPoolExecutor(max_workers=search_workers, mp_context=multiprocessing.get_context("spawn")),
+        }
+        self.requests = 0
+
+    def session(self, request):
+        try:
+            return self.sessions[request["game"]]
+        except (KeyError, TypeError):
+            raise ProtocolError(f"Unknown game: {request.get('game')!r}") from None
+
+    async def handle(self, request, owned):
+        """Serves one decoded request; ``owned`` collects the ids of games created on the connection."""
+        op = request.get("op")
+        applied = []
+        if op == "create":
+            size = request.get("size", 3)
+            mode = request.get("mode", "Simple")
+            if not isinstance(size, int) or not 3 <= size <= MAX_BOARD_SIZE:
+                raise ProtocolError(f"Board size must be between 3 and {MAX_BOARD_SIZE}")
+            if mode not in ("Simple", "General"):
+                raise ProtocolError(f"Unknown game mode: {mode!r}")
+            game_id = next(self.next_id)
+            try:
+                session = GameSession(game_id, size, mode, request.get("blue", "Human"), request.get("red", "Human"))
+            except ValueError as error:
+                raise ProtocolError(str(error)) from None
+            self.sessions[game_id] = session
+            owned.add(game_id)
+            async with session.lock:
+                await session.play_computers(self.executors, applied)
+        elif op == "move":
+            session = self.session(request)
+            try:
+                row, col, letter = int(request["row"]), int(request["col"]), request["letter"]
+            except (KeyError, TypeError, ValueError):
+                raise ProtocolError("A move needs integer 'row' and 'col' and a 'letter'") from None
+            if letter not in ("S", "O"):
+                raise ProtocolError("The letter must be 'S' or 'O'")
+            applied = await session.human_move(row, col, letter, self.executors)
+        elif op == "state":
+            session = self.session(request)
+            since = request.get("since", 0)
+            if not isinstance(since, int) or since < 0:
+                raise ProtocolError("'since' must be a non-negative move count")
+            applied = session.moves_since(since)
+        elif op == "resign":
+            session = self.session(request)
+            color = request.get("color")
+            if color not in (None, "Blue", "Red"):
+                raise ProtocolError("The color must be 'Blue' or 'Red'")
+            await session.resign(color)
+        else:
+            raise ProtocolError(f"Unknown op: {op!r}")
+        return {"ok": True, "state": session.state(), "moves": applied}
+
+    async def respond(self, line, writer, owned):
+        request_id = None
+        try:
+            request = json.loads(line)
+            if not isinstance(request, dict):
+                raise ProtocolError("A request must be a JSON object")
+            request_id = request.get("id")
+            response = await self.handle(request, owned)
+        except ProtocolError as error:
+            response = {"ok": False, "error": str(error)}
+        except json.JSONDecodeError as error:
+            response = {"ok": False, "error": f"Malformed JSON: {error}"}
+        except Exception as error:
+            # A bug in one request must not take the connection down with it
+            response = {"ok": False, "error": f"Internal error: {error!r}"}
+        self.requests += 1
+        if request_id is not None:
+            response["id"] = request_id
+        if not writer.is_closing():
+            writer.write(json.dumps(response).encode() + b"\n")
+
+    async def serve_connection(self, reader, writer):
+        owned = set()
+        tasks = set()
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                if line.strip():
+                    task = asyncio.create_task(self.respond(line, writer, owned))
+                    tasks.add(task)
+                    task.add_done_callback(tasks.discard)
+                if writer.transport.get_write_buffer_size() > 1 << 20:
+                    await writer.drain()
+            if tasks:
+                await asyncio.gather(*tasks)
+        except ConnectionError:
+            pass
+        finally:
+            for game_id in owned:
+                self.sessions.pop(game_id, None)
+            writer.close()
+
+    async def serve(self, host="127.0.0.1", port=8765, unix_path=None):
+        if unix_path:
+            server = await asyncio.start_unix_server(self.serve_connection, unix_path)
+        else:
+            server = await asyncio.start_server(self.serve_connection, host, port)
+        async with server:
+            await server.serve_forever()
+
+
+class GameClient:
+    """Minimal pipelining client: many requests in flight on one connection, matched up by id."""
+
+    def __init__(self, reader, writer):
+        self.reader = reader
+        self.writer = writer
+        self.pending = {}
+        self.next_id = itertools.count(1)
+        self.listener = asyncio.create_task(self.listen())
+
+    @classmethod
+    async def connect(cls, host="127.0.0.1", port=8765, unix_path=None):
+        if unix_path:
+            reader, writer = await asyncio.open_unix_connection(unix_path)
+        else:
+            reader, writer = await asyncio.open_connection(host, port)
+        return cls(reader, writer)
+
+    async def listen(self):
+        while True:
+            line = await self.reader.readline()
+            if not line:
+                break
+            response = json.loads(line)
+            future = self.pending.pop(response.get("id"), None)
+            if future is not None and not future.done():
+                future.set_result(response)
+        for future in self.pending.values():
+            if not future.done():
+                future.set_exception(ConnectionError("Connection closed"))
+
+    async def request(self, op, **fields):
+        """Sends one request and waits for its response."""
+        request_id = next(self.next_id)
+        future = asyncio.get_running_loop().create_future()
+        self.pending[request_id] = future
+        self.writer.write(json.dumps({"id": request_id, "op": op, **fields}).encode() + b"\n")
+        return await future
+
+    async def close(self):
+        self.writer.close()
+        self.listener.cancel()
+
+
+def percentile(values, fraction):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))] if ordered else 0.0
+
+
+async def play_load_game(client, size, game_mode, opponent, rng, latencies, counts):
+    """Plays one game as Blue with random moves against a server-side opponent."""
+    response = await client.request("create", size=size, mode=game_mode, blue="Human", red=opponent)
+    empty = make_empty_cells(size, default_backend(size))
+    while response["ok"]:
+        for move in response["moves"]:
+            empty.remove(move[0], move[1])
+        state = response["state"]
+        if not state["active"]:
+            break
+        row, col = empty.random_cell(rng)
+        start = time.perf_counter()
+        response = await client.request("move", game=state["game"], row=row, col=col, letter=rng.choice("SO"))
+        latencies.append(time.perf_counter() - start)
+        counts["moves"] += len(response.get("moves", ()))
+    if not response["ok"]:
+        counts["errors"] += 1
+    counts["games"] += 1
+
+
+async def run_load(games, connections, size, game_mode, opponent, seed, host, port, unix_path):
+    """Plays ``games`` concurrent games spread over ``connections`` client connections; returns a summary."""
+    clients = [await GameClient.connect(host, port, unix_path) for _ in range(connections)]
+    rng = random.Random(seed)
+    latencies = []
+    counts = {"games": 0, "moves": 0, "errors": 0}
+    start = time.perf_counter()
+    await asyncio.gather(*(play_load_game(clients[game % connections], size, game_mode, opponent,
+                                          random.Random(rng.getrandbits(64)), latencies, counts)
+                           for game in range(games)))
+    elapsed = time.perf_counter() - start
+    for client in clients:
+        await client.close()
+    return {
+        "games": counts["games"],
+        "moves": counts["moves"],
+        "errors": counts["errors"],
+        "seconds": elapsed,
+        "moves_per_second": counts["moves"] / elapsed if elapsed > 0 else float("inf"),
+        "move_requests": len(latencies),
+        "p50_ms": percentile(latencies, 0.5) * 1000,
+        "p99_ms": percentile(latencies, 0.99) * 1000,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Host SOS games over a JSON-lines protocol, or load-test a host.")
+    parser.add_argument("command", choices=["serve", "load"])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--unix", metavar="PATH", help="use a Unix socket instead of TCP")
+    parser.add_argument("--workers", type=int, default=4, help="threads for quick computer moves (serve)")
+    parser.add_argument("--search-workers", type=int, default=1,
+                        help="processes for search strategies such as AlphaBeta and MCTS (serve)")
+    parser.add_argument("--games", type=int, default=1000, help="concurrent games to play (load)")
+    parser.add_argument("--connections", type=int, default=10, help="client connections (load)")
+    parser.add_argument("--size", type=int, default=5, help="board size (load)")
+    parser.add_argument("--mode", choices=["Simple", "General"], default="General", help="game mode (load)")
+    parser.add_argument("--opponent", default="Random", help="server-side strategy playing Red (load)")
+    parser.add_argument("--seed", type=int, default=None, help="random seed (load)")
+    parser.add_argument("--spawn", action="store_true",
+                        help="start a server in a subprocess on a temporary Unix socket (load)")
+    args = parser.parse_args(argv)
+
+    if args.command == "serve":
+        try:
+            asyncio.run(GameServer(args.workers, args.search_workers).serve(args.host, args.port, args.unix))
+        except KeyboardInterrupt:
+            pass
+        return 0
+
+    server = None
+    unix_path = args.unix
+    if args.spawn:
+        unix_path = os.path.join(tempfile.mkdtemp(), "sos.sock")
+        server = subprocess.Popen([sys.executable, "-m", "game_server", "serve", "--unix", unix_path,
+                                   "--workers", str(args.workers), "--search-workers", str(args.search_workers)],
+                                  cwd=os.path.dirname(os.path.abspath(__file__)))
+        while not os.path.exists(unix_path):
+            if server.poll() is not None:
+                raise SystemExit("The game server failed to start")
+            time.sleep(0.05)
+    try:
+        summary = asyncio.run(run_load(args.games, args.connections, args.size, args.mode, args.opponent,
+                                       args.seed, args.host, args.port, unix_path))
+    finally:
+        if server:
+            server.terminate()
+            server.wait()
+            shutil.rmtree(os.path.dirname(unix_path), ignore_errors=True)
+    print(f"{summary['games']} games, {summary['moves']} moves in {summary['seconds']:.2f}s "
+          f"({summary['moves_per_second']:.0f} moves/s, {summary['errors']} errors)")
+    print(f"move latency over {summary['move_requests']} requests: p50 {summary['p50_ms']:.1f} ms, "
+          f"p99 {summary['p99_ms']:.1f} ms")
+    return 1 if summary["errors"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,236 @@
+# instrumentation.py
+#
+# Opt-in timing of the move pipeline. While enabled, an Instrumentation
+# wraps GameManager.make_move, BaseGameMode.make_move, check_sos and
+# is_board_full, and the choose_move of every computer player class, recording
+# per-method call counts and latency histograms. For players that search it
+# also collects search statistics: nodes visited, transposition table probes
+# and hits (alpha-beta), rollouts (MCTS) and endgame solver nodes.
+#
+# Nothing is wrapped until enable() is called, and disable() puts the
+# original methods back, so a disabled instrumentation costs nothing at all.
+# GameManager.make_move includes the GUI updates while BaseGameMode.make_move
+# is the engine alone, so comparing the two separates rendering time from
+# engine time.
+#
+#     with Instrumentation() as stats:
+#         ...play...
+#     print(stats.format_summary())
+#     stats.write_json("stats.json")
+
+import functools
+import json
+import threading
+import time
+
+from game_manager import GameManager
+from game_modes import BaseGameMode
+from player import ComputerPlayer
+
+# Histogram bucket b counts calls that took less than 2 ** b microseconds (and
+# at least 2 ** (b - 1)); the last bucket also takes everything slower
+HISTOGRAM_BUCKETS = 32
+
+
+class CallStats:
+    """Call count, total and maximum time and a log2 latency histogram of one method."""
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.buckets = [0] * HISTOGRAM_BUCKETS
+
+    def add(self, seconds):
+        self.count += 1
+        self.total += seconds
+        if seconds > self.max:
+            self.max = seconds
+        self.buckets[min(int(seconds * 1e6).bit_length(), HISTOGRAM_BUCKETS - 1)] += 1
+
+    def percentile(self, fraction):
+        """Returns an upper bound, in microseconds, on the given fraction of call latencies."""
+        target = fraction * self.count
+        seen = 0
+        for bucket, count in enumerate(self.buckets):
+            seen += count
+            if count and seen >= target:
+                return float(2 ** bucket)
+        return 0.0
+
+    def to_dict(self):
+        return {
+            "calls": self.count,
+            "total_seconds": self.total,
+            "mean_us": self.total / self.count * 1e6 if self.count else 0.0,
+            "max_us": self.max * 1e6,
+            "p50_us": self.percentile(0.5),
+            "p99_us": self.percentile(0.99),
+            "histogram_us": {f"<{2 ** bucket}": count for bucket, count in enumerate(self.buckets) if count},
+        }
+
+
+def computer_player_classes(base=ComputerPlayer):
+    """Returns ``base`` and all its subclasses that define their own choose_move."""
+    classes = [base] if "choose_move" in vars(base) else []
+    for subclass in base.__subclasses__():
+        classes.extend(computer_player_classes(subclass))
+    return classes
+
+
+def search_counters(player):
+    """Returns the cumulative search counters of a player, or None if it does not search."""
+    search = getattr(player, "search", None) or getattr(player, "fallback", None)
+    endgame = player.endgame if getattr(player, "endgame_threshold", 0) else None
+    if search is None and endgame is None:
+        return None
+    counters = {}
+    if search is not None:
+        if hasattr(search, "nodes"):
+            counters["nodes"] = search.nodes
+        table = getattr(search, "table", None)
+        if table is not None:
+            counters["table_probes"] = table.probes
+            counters["table_hits"] = table.hits
+        if hasattr(search, "rollouts"):
+            counters["rollouts"] = search.rollouts
+    if endgame is not None:
+        counters["endgame_nodes"] = endgame.nodes
+    return counters
+
+
+class Instrumentation:
+    """Records call counts, latency histograms and search statistics while enabled."""
+
+    def __init__(self):
+        self.calls = {}  # "Class.method" -> CallStats
+        self.search = {}  # "Class" -> {counter: total}
+        self.patched = []  # (class, method name, original function)
+        self.reporter = None
+
+    @property
+    def enabled(self):
+        return bool(self.patched)
+
+    def targets(self):
+        """Returns the (class, method name) pairs that get wrapped."""
+        targets = [(GameManager, "make_move"), (BaseGameMode, "make_move"),
+                   (BaseGameMode, "check_sos"), (BaseGameMode, "is_board_full")]
+        return targets + [(cls, "choose_move") for cls in computer_player_classes()]
+
+    def enable(self):
+        """Starts recording by wrapping every target method."""
+        if self.enabled:
+            return
+        for cls, name in self.targets():
+            original = vars(cls)[name]
+            wrapper = self.wrap_choose_move if name == "choose_move" else self.wrap
+            setattr(cls, name, wrapper(original, f"{cls.__name__}.{name}"))
+            self.patched.append((cls, name, original))
+
+    def disable(self):
+        """Stops recording and restores the original methods; collected data is kept."""
+        self.stop_reporting()
+        for cls, name, original in reversed(self.patched):
+            setattr(cls, name, original)
+        self.patched = []
+
+    def reset(self):
+        """Drops everything recorded so far."""
+        self.calls = {}
+        self.search = {}
+
+    def stats_for(self, name):
+        stats = self.calls.get(name)
+        if stats is None:
+            stats = self.calls[name] = CallStats()
+        return stats
+
+    def wrap(self, function, name):
+        stats = self.stats_for(name)
+        clock = time.perf_counter
+
+        @functools.wraps(function)
+        def timed(*args, **kwargs):
+            start = clock()
+            try:
+                return function(*args, **kwargs)
+            finally:
+                stats.add(clock() - start)
+
+        return timed
+
+    def wrap_choose_move(self, function, name):
+        """Like wrap, but also adds the player's search counters for the call.
+
+        Strategies share ComputerPlayer.choose_move, so calls are recorded
+        under the class of the player that made them.
+        """
+        clock = time.perf_counter
+        method = name.rpartition(".")[2]
+
+        @functools.wraps(function)
+        def timed(player, *args, **kwargs):
+            stats = self.stats_for(f"{type(player).__name__}.{method}")
+            before = search_counters(player)
+            start = clock()
+            try:
+                return function(player, *args, **kwargs)
+            finally:
+                stats.add(clock() - start)
+                after = search_counters(player)
+                if after:
+                    totals = self.search.setdefault(type(player).__name__, {})
+                    for counter, value in after.items():
+                        # The counters accumulate over the player's life; the call adds what it did
+                        totals[counter] = totals.get(counter, 0) + value - before.get(counter, 0)
+
+        return timed
+
+    def to_dict(self):
+        return {
+            "calls": {name: stats.to_dict() for name, stats in sorted(self.calls.items()) if stats.count},
+            "search": self.search,
+        }
+
+    def to_json(self, indent=2):
+        return json.dumps(self.to_dict(), indent=indent)
+
+    def write_json(self, path):
+        with open(path, "w") as handle:
+            handle.write(self.to_json())
+
+    def format_summary(self):
+        """Returns a human-readable table of everything recorded."""
+        lines = [f"{'method':<30} {'calls':>9} {'total s':>9} {'mean us':>9} {'p50 us':>8} {'p99 us':>8} {'max us':>9}"]
+        for name, stats in sorted(self.calls.items()):
+            if stats.count:
+                lines.append(f"{name:<30} {stats.count:>9} {stats.total:>9.3f} {stats.total / stats.count * 1e6:>9.1f}"
+                             f" {stats.percentile(0.5):>8.0f} {stats.percentile(0.99):>8.0f} {stats.max * 1e6:>9.0f}")
+        for player, counters in sorted(self.search.items()):
+            lines.append(f"{player}: " + ", ".join(f"{counter} {value}" for counter, value in sorted(counters.items())))
+        return "\n".join(lines)
+
+    def start_reporting(self, interval=10.0, output=print):
+        """Passes a summary to ``output`` every ``interval`` seconds from a background thread."""
+        self.stop_reporting()
+        stop = threading.Event()
+
+        def report():
+            while not stop.wait(interval):
+                output(self.format_summary())
+
+        self.reporter = stop
+        threading.Thread(target=report, daemon=True).start()
+
+    def stop_reporting(self):
+        if self.reporter is not None:
+            self.reporter.set()
+            self.reporter = None
+
+    def __enter__(self):
+        self.enable()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.disable()
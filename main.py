@@ -1,12 +1,20 @@
+import os
 import tkinter as tk
-from game_manager import GameManager
+from game_manager import PACES, GameManager
+from player import PLAYER_STRATEGIES
 from player_controls import PlayerControls
-from game_board import GameBoard
-from player import HumanPlayer
-from player import ComputerPlayer
+from canvas_board import CanvasGameBoard
+
+
+# Largest board offered in the GUI; larger boards (up to boards.MAX_BOARD_SIZE)
+# are for headless play, as their cells would be too small to click
+MAX_GUI_BOARD_SIZE = CanvasGameBoard.max_board_size
 
 
 class SOSGameGUI:
+    # Board widget class; game_board.GameBoard is the one-button-per-cell alternative
+    board_class = CanvasGameBoard
+
     def __init__(self, root):
         self.root = root
         self.root.title("SOS Application")
@@ -77,8 +85,8 @@ class SOSGameGUI:
         board_size_label.grid(row=0, column=2, padx=5, pady=1, sticky="w")
         self.board_size_var = tk.IntVar(value=3)
         vcmd = (self.root.register(self.validate_board_size), '%P')
-        self.board_size_spinbox = tk.Spinbox(parent, from_=3, to=20, textvariable=self.board_size_var,
-                                             validate="key", validatecommand=vcmd, width=3)
+        self.board_size_spinbox = tk.Spinbox(parent, from_=3, to=MAX_GUI_BOARD_SIZE, textvariable=self.board_size_var,
+                                             validate="key", validatecommand=vcmd, width=4)
         self.board_size_spinbox.grid(row=0, column=3, padx=5, pady=1, sticky="w")
 
         # Player Type Selection for Blue Player
@@ -86,12 +94,16 @@ class SOSGameGUI:
         self.blue_player_type = tk.StringVar(value="Human")
         tk.Radiobutton(parent, text="Human", variable=self.blue_player_type, value="Human").grid(row=1, column=1)
         tk.Radiobutton(parent, text="Computer", variable=self.blue_player_type, value="Computer").grid(row=1, column=2)
+        self.blue_strategy = tk.StringVar(value="Random")
+        tk.OptionMenu(parent, self.blue_strategy, *PLAYER_STRATEGIES).grid(row=1, column=3, sticky="w")
 
         # Player Type Selection for Red Player
         tk.Label(parent, text="Red Player").grid(row=2, column=0, padx=5, pady=1, sticky="w")
         self.red_player_type = tk.StringVar(value="Human")
         tk.Radiobutton(parent, text="Human", variable=self.red_player_type, value="Human").grid(row=2, column=1)
         tk.Radiobutton(parent, text="Computer", variable=self.red_player_type, value="Computer").grid(row=2, column=2)
+        self.red_strategy = tk.StringVar(value="Random")
+        tk.OptionMenu(parent, self.red_strategy, *PLAYER_STRATEGIES).grid(row=2, column=3, sticky="w")
 
     def setup_bottom_controls(self, parent):
         """Sets up the bottom controls like Start/End game button and Current Turn label."""
@@ -102,6 +114,13 @@ class SOSGameGUI:
         self.turn_label.grid(row=1, column=0, padx=10, pady=5)
         self.turn_label.grid_remove()  # Hide initially until game starts
 
+        # Pace of computer moves; stays enabled so a running game can be sped up or slowed down
+        pace_frame = tk.Frame(parent)
+        pace_frame.grid(row=2, column=0, padx=10, pady=5)
+        tk.Label(pace_frame, text="Computer pace").grid(row=0, column=0, padx=5)
+        self.pace_var = tk.StringVar(value=self.game_manager.pace)
+        tk.OptionMenu(pace_frame, self.pace_var, *PACES, command=self.game_manager.set_pace).grid(row=0, column=1)
+
     def create_scrollable_board_frame(self):
         """Sets up the frame that will hold the game board."""
         self.board_frame = tk.Frame(self.main_frame)
@@ -120,9 +139,9 @@ class SOSGameGUI:
         selected_mode = self.radio_var.get().split()[0]  # "Simple" or "General"
         self.board_size = self.board_size_var.get()
 
-        # Retrieve player type selections
-        blue_type = self.blue_player_type.get()  # "Human" or "Computer"
-        red_type = self.red_player_type.get()  # "Human" or "Computer"
+        # Retrieve player type selections: "Human" or the chosen computer strategy
+        blue_type = self.selected_player_type(self.blue_player_type, self.blue_strategy)
+        red_type = self.selected_player_type(self.red_player_type, self.red_strategy)
 
         # Set up the game manager with player types and game mode
         self.game_manager.reset_game(self.board_size, selected_mode, blue_type, red_type)
@@ -130,10 +149,12 @@ class SOSGameGUI:
         # Display the chosen game mode and board size
         self.turn_label.config(text=f"Game Mode: {selected_mode}, Board Size: {self.board_size}x{self.board_size}")
 
-        # Adjust the window size and initialize the game board UI
+        # Adjust the window size and initialize the game board UI, reusing the board across games
         self.adjust_window_size(self.board_size)
-        self.board = GameBoard(self.board_frame, self.board_size, self.on_board_click)
-        self.board.create_board()
+        if self.board is None:
+            self.board = self.board_class(self.board_frame, self.board_size, self.on_board_click)
+        else:
+            self.board.reset(self.board_size)
 
         # Enable gameplay controls and disable start options
         self.enable_gameplay_controls()
@@ -145,8 +166,11 @@ class SOSGameGUI:
         self.turn_label.grid()
 
         # Trigger the first move if the current player is a ComputerPlayer
-        if isinstance(self.game_manager.current_player, ComputerPlayer):
-            self.game_manager.current_player.make_move(self.game_manager.mode)
+        self.game_manager.start_computer_turn()
+
+    def selected_player_type(self, type_var, strategy_var):
+        """Returns "Human", or the strategy name chosen for a computer player."""
+        return strategy_var.get() if type_var.get() == "Computer" else "Human"
 
     def end_game(self):
         self.is_game_active = False
@@ -161,7 +185,7 @@ class SOSGameGUI:
         """Enables game mode selection and board size options; disables other controls."""
         # Enable game mode and board size controls
         for widget in self.top_frame.winfo_children():
-            if isinstance(widget, (tk.Radiobutton, tk.Spinbox)):
+            if isinstance(widget, (tk.Radiobutton, tk.Spinbox, tk.OptionMenu)):
                 widget.config(state="normal")
 
         # Disable player controls and board
@@ -178,7 +202,7 @@ class SOSGameGUI:
         """Enables gameplay controls and disables game mode and board size options."""
         # Disable game mode and board size controls
         for widget in self.top_frame.winfo_children():
-            if isinstance(widget, (tk.Radiobutton, tk.Spinbox)):
+            if isinstance(widget, (tk.Radiobutton, tk.Spinbox, tk.OptionMenu)):
                 widget.config(state="disabled")
 
         # Enable player controls
@@ -188,9 +212,7 @@ class SOSGameGUI:
 
         # Enable the board buttons
         if self.board:
-            for row in self.board.board_buttons:
-                for button in row:
-                    button.config(state="normal")
+            self.board.enable_buttons()
 
         # Enable the Start/End button
         self.start_button.config(state="normal")
@@ -205,7 +227,7 @@ class SOSGameGUI:
 
     def validate_board_size(self, new_value):
         if new_value.isdigit():
-            return 3 <= int(new_value) <= 20
+            return 3 <= int(new_value) <= MAX_GUI_BOARD_SIZE
         return False
 
     def adjust_window_size(self, board_size):
@@ -218,9 +240,25 @@ class SOSGameGUI:
 
 
 def main():
+    # SOS_INSTRUMENT=stats.json times the move pipeline, prints a summary every
+    # 10 seconds and writes the collected data to that file on exit
+    instrument_path = os.environ.get("SOS_INSTRUMENT")
+    instrumentation = None
+    if instrument_path:
+        from instrumentation import Instrumentation
+        instrumentation = Instrumentation()
+        instrumentation.enable()
+        instrumentation.start_reporting(10.0)
+
     root = tk.Tk()
     app = SOSGameGUI(root)
-    root.mainloop()
+    try:
+        root.mainloop()
+    finally:
+        app.game_manager.close_players()
+        if instrumentation:
+            instrumentation.disable()
+            instrumentation.write_json(instrument_path)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,241 @@
+# mcts.py
+#
+# Monte Carlo Tree Search for the computer players on boards too large for
+# exhaustive search. The search uses root parallelism: every worker process
+# grows its own tree from the current position with its own random seed until
+# the move's time budget runs out, then the visit and win counts of the root
+# moves are summed and the most visited move is played.
+#
+# Rollouts run on a SearchState (BitBoard + empty-cell index) and never touch
+# the GUI or the game modes.
+
+import math
+import multiprocessing
+import os
+import random
+import threading
+import time
+
+from game_modes import SimpleGameMode
+from search import SearchState, board_letters
+
+EXPLORATION = math.sqrt(2)
+
+
+class Node:
+    """One tree node: the position reached after ``move`` was played by ``mover``."""
+
+    __slots__ = ("move", "mover", "children", "untried", "visits", "wins", "terminal")
+
+    def __init__(self, move, mover, untried, terminal=None):
+        self.move = move
+        self.mover = mover  # +1 for the root player, -1 for the opponent
+        self.children = []
+        self.untried = untried
+        self.visits = 0
+        self.wins = 0.0  # Reward collected from the mover's point of view
+        self.terminal = terminal  # Root player's reward if the game ended here
+
+    def select_child(self):
+        """Returns the child with the highest UCT score."""
+        log_visits = math.log(self.visits)
+        return max(self.children, key=lambda child: child.wins / child.visits
+                   + EXPLORATION * math.sqrt(log_visits / child.visits))
+
+
+def legal_moves(state, rng):
+    """Returns every legal (row, col, letter) in random order."""
+    moves = [(row, col, letter) for row, col in state.empty for letter in "SO"]
+    rng.shuffle(moves)
+    return moves
+
+
+def game_reward(simple, score_diff, sos_winner):
+    """Returns the root player's reward (1 win, 0.5 draw, 0 loss) for a finished game."""
+    if simple:
+        return 0.5 if sos_winner == 0 else (1.0 if sos_winner > 0 else 0.0)
+    return 0.5 if score_diff == 0 else (1.0 if score_diff > 0 else 0.0)
+
+
+def apply_move(state, move, to_move, score_diff):
+    """Plays a move and returns (to_move, score_diff, sos_winner, game_over)."""
+    row, col, letter = move
+    state.play(row, col, letter)
+    sos = state.board.count_sos(row, col)
+    if sos:
+        if state.simple:
+            return to_move, score_diff, to_move, True
+        score_diff += sos * to_move
+    else:
+        to_move = -to_move
+    return to_move, score_diff, 0, state.empty.is_full()
+
+
+def run_search(board_size, simple, letters, score_diff, deadline, seed, stop=None):
+    """Grows one MCTS tree until ``deadline`` (a time.time() value) or until ``stop()`` is true.
+
+    Returns ``(root_stats, rollouts)`` where ``root_stats`` maps each expanded
+    root move to its (visits, wins) from the root player's point of view.
+    """
+    rng = random.Random(seed)
+    state = SearchState(board_size, simple, letters)
+    root = Node(None, -1, legal_moves(state, rng))
+    rollouts = 0
+
+    while True:
+        # Always finish at least one iteration so the root has a move to report
+        if rollouts and (time.time() >= deadline or (stop and stop())):
+            break
+        node = root
+        path = [root]
+        played = []
+        to_move, diff, winner = 1, score_diff, 0
+
+        # Selection
+        while node.terminal is None and not node.untried and node.children:
+            node = node.select_child()
+            played.append(node.move)
+            to_move, diff, winner, _ = apply_move(state, node.move, to_move, diff)
+            path.append(node)
+
+        # Expansion
+        if node.terminal is None and node.untried:
+            move = node.untried.pop()
+            mover = to_move
+            played.append(move)
+            to_move, diff, winner, game_over = apply_move(state, move, to_move, diff)
+            terminal = game_reward(simple, diff, winner) if game_over else None
+            child = Node(move, mover, [] if game_over else legal_moves(state, rng), terminal)
+            node.children.append(child)
+            node = child
+            path.append(node)
+
+        # Rollout
+        if node.terminal is not None:
+            reward = node.terminal
+        else:
+            game_over = False
+            while not game_over:
+                row, col = state.empty.random_cell(rng)
+                move = (row, col, 'S' if rng.random() < 0.5 else 'O')
+                played.append(move)
+                to_move, diff, winner, game_over = apply_move(state, move, to_move, diff)
+            reward = game_reward(simple, diff, winner)
+        rollouts += 1
+
+        # Backpropagation
+        for visited in path:
+            visited.visits += 1
+            visited.wins += reward if visited.mover == 1 else 1.0 - reward
+
+        for row, col, letter in reversed(played):
+            state.unplay(row, col, letter)
+
+    stats = {child.move: (child.visits, child.wins) for child in root.children}
+    return stats, rollouts
+
+
+def _run_search_task(args):
+    """Process pool entry point for run_search."""
+    return run_search(*args)
+
+
+def _worker_ready(_):
+    """No-op task; running it proves a pool worker has started and imported this module."""
+
+
+class MCTSSearch:
+    """Root-parallel MCTS over a process pool with a per-move time budget."""
+
+    def __init__(self, time_budget=1.0, workers=None):
+        self.time_budget = time_budget
+        self.workers = workers or os.cpu_count() or 1
+        self.pool = None
+        self.pool_lock = threading.Lock()  # close() may come from another thread mid-search
+        self.last_stats = None
+        self.rollouts = 0  # Rollouts of every search so far
+        self.stopped = False
+
+    def cancel(self):
+        """Stops a running search (from another thread); best_move then returns None."""
+        self.stopped = True
+
+    def best_move(self, game_mode):
+        """Returns the most visited root move for the side to move.
+
+        Returns None if the board is full or the search was cancelled or
+        its pool closed.
+        """
+        if game_mode.empty_cells.is_full():
+            return None
+        self.stopped = False
+        simple = isinstance(game_mode, SimpleGameMode)
+        score_diff = 0
+        if not simple:
+            opponent = "Red" if game_mode.current_color == "Blue" else "Blue"
+            score_diff = game_mode.sos_count[game_mode.current_color] - game_mode.sos_count[opponent]
+        letters = board_letters(game_mode)
+        if self.workers > 1:
+            # Starting the workers must not eat into the move's time budget
+            self.start_pool()
+
+        start = time.time()
+        tasks = [(game_mode.board_size, simple, letters, score_diff,
+                  start + self.time_budget, random.getrandbits(64)) for _ in range(self.workers)]
+        if self.workers == 1:
+            results = [run_search(*tasks[0], stop=lambda: self.stopped)]
+        else:
+            with self.pool_lock:
+                if self.pool is None:
+                    return None  # Closed since start_pool
+                pending = self.pool.map_async(_run_search_task, tasks)
+            while not pending.ready():
+                pending.wait(0.05)
+                if self.stopped:
+                    # Workers cannot be interrupted mid-search; drop the pool instead
+                    self.close()
+                    return None
+            results = pending.get()
+        elapsed = time.time() - start
+        if self.stopped:
+            return None
+
+        merged = {}
+        total_rollouts = 0
+        for stats, rollouts in results:
+            total_rollouts += rollouts
+            for move, (visits, wins) in stats.items():
+                old_visits, old_wins = merged.get(move, (0, 0.0))
+                merged[move] = (old_visits + visits, old_wins + wins)
+
+        self.rollouts += total_rollouts
+        move = max(merged, key=lambda m: merged[m][0])
+        visits, wins = merged[move]
+        self.last_stats = {
+            "rollouts": total_rollouts,
+            "seconds": elapsed,
+            "rollouts_per_second": total_rollouts / elapsed if elapsed > 0 else float("inf"),
+            "workers": self.workers,
+            "visits": visits,
+            "win_rate": wins / visits,
+        }
+        return move
+
+    def start_pool(self):
+        """Starts the worker pool if it is not running and waits until every worker is ready."""
+        with self.pool_lock:
+            if self.pool is None:
+                # Spawned workers do not inherit the Tk state of a GUI process
+                self.pool = multiprocessing.get_context("spawn").Pool(self.workers)
+                self.pool.map(_worker_ready, range(self.workers), chunksize=1)
+
+    def close(self):
+        """Shuts down the worker pool; the next search starts a new one.
+
+        A search running on another thread gives up and returns None.
+        """
+        with self.pool_lock:
+            if self.pool is not None:
+                self.stopped = True
+                self.pool.terminate()
+                self.pool = None
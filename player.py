@@ -1,6 +1,14 @@
 # player.py
 
 import random
+import threading
+import time
+
+from endgame import ENDGAME_THRESHOLD, ENDGAME_TIME_BUDGET, EndgameSolver
+from mcts import MCTSSearch
+from search import MAX_SEARCH_BOARD_SIZE, AlphaBetaSearch
+from segments import track_board
+from tablebase import tablebase_for
 
 class BasePlayer:
     """Base class for a player in the SOS game."""
@@ -18,6 +26,12 @@ class BasePlayer:
         """Method to make a move. Specific to each subclass."""
         raise NotImplementedError("Subclasses should implement this method.")
 
+    def submit_move(self, game_mode, row, col):
+        """Sends the move through the GameManager when there is one, else straight to the game mode."""
+        if game_mode.game_manager is not None:
+            return game_mode.game_manager.make_move(row, col, self.choice)
+        return game_mode.make_move(row, col, self.choice)
+
 
 class HumanPlayer(BasePlayer):
     """Represents a human player."""
@@ -29,26 +43,251 @@ class HumanPlayer(BasePlayer):
     def make_move(self, game_mode, row, col):
         """Make a move in the game mode based on player input from GUI controls."""
         self.choice = self.controls.get_choice()  # Fetch selected 'S' or 'O' from controls
-        game_mode.make_move(row, col, self.choice)
+        return self.submit_move(game_mode, row, col)
 
 
 class ComputerPlayer(BasePlayer):
-    """Represents a computer player with basic move logic."""
+    """Represents a computer player with basic move logic.
+
+    Subclasses implement their strategy in ``choose_strategy_move``.
+    Strategies that opt in by setting ``endgame_threshold`` hand positions
+    with fewer empty cells to an exact endgame solver first; if it has not
+    finished within ``endgame_time_budget`` seconds, the strategy picks the
+    move after all.
+    """
+
+    endgame_threshold = 0  # 0 leaves endgames to the strategy
+    endgame_time_budget = ENDGAME_TIME_BUDGET
+    max_board_size = None  # Largest board the strategy can play; None for any size
 
     def __init__(self, name, color):
         super().__init__(name, color)
+        self.endgame = EndgameSolver()
+        self.move_started = None  # time.perf_counter() when the current choose_move began
+
+    def choose_move(self, game_mode):
+        """Picks a move without applying it; returns (row, col, character) or None if the board is full."""
+        self.stop_pondering()
+        self.move_started = time.perf_counter()
+        if len(game_mode.empty_cells) < self.endgame_threshold:
+            move = self.endgame.best_move(game_mode, self.move_started + self.endgame_time_budget)
+            if move is not None:
+                return move
+        return self.choose_strategy_move(game_mode)
+
+    def choose_strategy_move(self, game_mode):
+        """Picks a move with the player's own strategy."""
+        # Simple strategy: pick a uniformly random empty cell from the game mode's index
+        cell = game_mode.empty_cells.random_cell()
+        if cell is None:
+            return None
+        row, col = cell
+        character = "S" if random.choice([True, False]) else "O"  # Randomly choose S or O
+        return row, col, character
+
+    def cancel(self):
+        """Asks a running choose_move (on another thread) to give up; the basic strategy never runs long."""
+
+    def ponder(self, game_mode):
+        """Starts thinking in the background during the opponent's turn; the basic strategy does not."""
+
+    def stop_pondering(self):
+        """Stops background thinking started by ponder."""
+
+    def close(self):
+        """Releases resources kept between moves, such as worker processes; they are recreated on demand."""
 
     def make_move(self, game_mode):
         """Automatically make a move using a basic strategy."""
-        # Simple strategy: fill an empty spot or attempt to complete an SOS pattern if possible
-        empty_cells = [
-            (r, c) for r in range(game_mode.board_size)
-            for c in range(game_mode.board_size)
-            if game_mode.board[r][c] == ' '
-        ]
-
-        if empty_cells:
-            # Randomly select an empty cell for simplicity
-            row, col = random.choice(empty_cells)
-            self.choice = "S" if random.choice([True, False]) else "O"  # Randomly choose S or O
-            game_mode.make_move(row, col, self.choice)
+        move = self.choose_move(game_mode)
+        if move:
+            row, col, self.choice = move
+            return self.submit_move(game_mode, row, col)
+
+
+class GreedyPlayer(ComputerPlayer):
+    """Computer player that takes the biggest SOS on offer and otherwise avoids handing one to the opponent.
+
+    Uses the game mode's segment tracker (modes track segments by default);
+    for modes built with track_segments=False one is set up from the board
+    on every move.
+    """
+
+    # Random cells to try for a safe move before scanning the whole board
+    samples = 32
+
+    def choose_strategy_move(self, game_mode):
+        if game_mode.empty_cells.is_full():
+            return None
+        segments = game_mode.segments
+        if segments is None:
+            segments = track_board(game_mode.board, game_mode.board_size, game_mode.backend)
+        completing = segments.completing_moves()
+        if completing:
+            best = max(move[3] for move in completing)
+            row, col, character, _ = random.choice([move for move in completing if move[3] == best])
+            return row, col, character
+
+        size = game_mode.board_size
+        for _ in range(self.samples):
+            row, col = game_mode.empty_cells.random_cell()
+            safe = [letter for letter in "SO" if not segments.threat_count(row * size + col, letter)]
+            if safe:
+                return row, col, random.choice(safe)
+        # No luck sampling: pick the move that sets up the fewest SOS for the opponent
+        return min((segments.threat_count(row * size + col, letter), random.random(), row, col, letter)
+                   for row, col in game_mode.empty_cells for letter in "SO")[2:]
+
+
+class AlphaBetaPlayer(ComputerPlayer):
+    """Computer player that looks ahead with negamax, alpha-beta pruning and a transposition table."""
+
+    endgame_threshold = ENDGAME_THRESHOLD
+    max_board_size = MAX_SEARCH_BOARD_SIZE
+
+    def __init__(self, name, color, depth=2, table_memory=16 * 1024 * 1024):
+        super().__init__(name, color)
+        # The transposition table is kept across moves; its size is fixed by table_memory (bytes)
+        self.search = AlphaBetaSearch(depth, table_memory)
+        # Each reply is pondered as deep as our own search will look after it
+        self.ponder_depth = depth
+        self.ponder_thread = None
+
+    def choose_strategy_move(self, game_mode):
+        """Picks the move with the best searched value for the side to move."""
+        return self.search.best_move(game_mode)
+
+    def cancel(self):
+        self.search.cancel()
+
+    def ponder(self, game_mode):
+        """Searches the opponent's position on a background thread, warming the transposition table."""
+        self.stop_pondering()
+        self.search.stopped = False
+        self.ponder_thread = threading.Thread(target=self.search.ponder,
+                                              args=(game_mode.snapshot(), self.ponder_depth), daemon=True)
+        self.ponder_thread.start()
+
+    def stop_pondering(self):
+        if self.ponder_thread is not None:
+            self.search.cancel()
+            self.ponder_thread.join()
+            self.ponder_thread = None
+
+
+class AnytimePlayer(AlphaBetaPlayer):
+    """Computer player that deepens an alpha-beta search until a hard per-move deadline.
+
+    Per-move latency is bounded by ``time_budget`` (seconds) on every board
+    size the search accepts, which makes the budget a difficulty setting. The depth reached and
+    time used by the last move are kept in ``search.last_stats``.
+    """
+
+    def __init__(self, name, color, time_budget=0.5, max_depth=None, table_memory=16 * 1024 * 1024,
+                 verbose=False):
+        super().__init__(name, color, table_memory=table_memory)
+        self.time_budget = time_budget
+        self.max_depth = max_depth
+        self.ponder_depth = max_depth  # Ponder as deep as the opponent gives us time for
+        self.verbose = verbose
+
+    @property
+    def endgame_time_budget(self):
+        # The endgame solver and the search share the per-move budget
+        return self.time_budget / 2
+
+    def choose_strategy_move(self, game_mode):
+        time_left = max(0.0, self.move_started + self.time_budget - time.perf_counter())
+        move = self.search.timed_best_move(game_mode, time_left, self.max_depth)
+        if move and self.verbose:
+            stats = self.search.last_stats
+            print(f"{self.color}: depth {stats['depth']} in {stats['seconds'] * 1000:.0f} ms "
+                  f"({stats['nodes']} nodes)")
+        return move
+
+
+class MCTSPlayer(ComputerPlayer):
+    """Computer player that runs root-parallel Monte Carlo Tree Search across a process pool."""
+
+    max_board_size = MAX_SEARCH_BOARD_SIZE
+
+    def __init__(self, name, color, time_budget=1.0, workers=None, verbose=False):
+        super().__init__(name, color)
+        self.search = MCTSSearch(time_budget, workers)
+        self.verbose = verbose
+
+    def choose_strategy_move(self, game_mode):
+        """Picks the most visited move after the time budget; throughput is kept in ``search.last_stats``."""
+        move = self.search.best_move(game_mode)
+        if move and self.verbose:
+            stats = self.search.last_stats
+            print(f"{self.color}: {stats['rollouts']} rollouts in {stats['seconds']:.2f}s "
+                  f"({stats['rollouts_per_second']:.0f}/s on {stats['workers']} workers)")
+        return move
+
+    def cancel(self):
+        self.search.cancel()
+
+    def close(self):
+        self.search.close()
+
+
+class TablebasePlayer(ComputerPlayer):
+    """Computer player that plays perfectly by looking positions up in a precomputed tablebase.
+
+    Tables are built offline with ``python -m tablebase``; on boards without a
+    table the player falls back to alpha-beta search.
+    """
+
+    max_board_size = MAX_SEARCH_BOARD_SIZE
+
+    def __init__(self, name, color, directory=None, fallback_depth=2):
+        super().__init__(name, color)
+        self.directory = directory
+        self.fallback = AlphaBetaSearch(fallback_depth)
+
+    def choose_strategy_move(self, game_mode):
+        table = tablebase_for(game_mode, self.directory)
+        if table is None:
+            return self.fallback.best_move(game_mode)
+        return table.best_move(game_mode)
+
+    def cancel(self):
+        self.fallback.cancel()
+
+
+# Computer strategies selectable by name in headless tools such as the tournament
+# runner. Factories take (name, color) and return a player exposing choose_move.
+PLAYER_STRATEGIES = {}
+
+
+def register_strategy(name, factory):
+    """Registers a computer player factory under a strategy name."""
+    PLAYER_STRATEGIES[name] = factory
+
+
+def create_player(strategy, name, color, board_size=None):
+    """Creates a computer player for a registered strategy name.
+
+    With a board_size, strategies that cannot play boards that large are
+    rejected with a ValueError instead of failing on their first move.
+    """
+    try:
+        factory = PLAYER_STRATEGIES[strategy]
+    except KeyError:
+        raise ValueError(f"Unknown player strategy: {strategy!r}") from None
+    player = factory(name, color)
+    limit = player.max_board_size
+    if board_size is not None and limit is not None and board_size > limit:
+        player.close()
+        raise ValueError(f"{strategy} supports boards up to {limit}x{limit}, not {board_size}x{board_size}")
+    return player
+
+
+register_strategy("Random", ComputerPlayer)
+register_strategy("Greedy", GreedyPlayer)
+register_strategy("AlphaBeta", AlphaBetaPlayer)
+register_strategy("Tablebase", TablebasePlayer)
+register_strategy("Anytime", lambda name, color: AnytimePlayer(name, color, time_budget=0.05))
+# A single worker keeps MCTS usable inside other process pools
+register_strategy("MCTS", lambda name, color: MCTSPlayer(name, color, time_budget=0.1, workers=1))
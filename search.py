@@ -0,0 +1,434 @@
+# search.py
+#
+# Negamax search with alpha-beta pruning for the computer players.
+#
+# Positions are searched on a SearchState, a compact GUI-free copy of the game
+# mode built on a BitBoard that supports make/unmake and carries an
+# incrementally XORed Zobrist hash. Search values are always the net number
+# of SOS the side to move will still score from this position on (General
+# rules), or a win/loss score (Simple rules). Both depend only on the letters
+# on the board, never on who is to move or the score so far, so the hash does
+# not need to include either.
+#
+# The hash is symmetric (see symmetry.py): the transposition table is keyed
+# on the canonical image of a position and stores moves in that image's
+# frame, so the 8 rotations and reflections of a position share one entry,
+# and moves that a symmetry of the root maps onto each other are searched
+# only once.
+
+import random
+import time
+
+from boards import SPARSE_THRESHOLD, BitBoard, EmptyCellIndex
+from game_modes import SimpleGameMode
+from segments import SegmentTracker
+from symmetry import INVERSE, SymmetricHash, transform_move, unique_moves
+
+WIN_SCORE = 10000
+INFINITY = float("inf")
+
+# Transposition table entry flags
+EXACT, LOWER, UPPER = 0, 1, 2
+
+# Rough size of one table entry (slot, tuple, key and move objects) in bytes
+TABLE_ENTRY_BYTES = 200
+
+# Largest board a SearchState accepts. Copying a position out of a game and
+# listing the moves of a node both cost O(n * n), so on the sparse-sized
+# boards above this no search could keep to a per-move time budget.
+MAX_SEARCH_BOARD_SIZE = SPARSE_THRESHOLD
+
+def board_letters(game_mode):
+    """Returns the board of a game mode as one string of letters, row by row."""
+    size = game_mode.board_size
+    return "".join(game_mode.board.get(row, col) for row in range(size) for col in range(size))
+
+
+class SearchState:
+    """A compact position that supports fast make/unmake.
+
+    ``letters`` lists the cells row by row (' ', 'S' or 'O'); use
+    ``from_game_mode`` to copy the position out of a running game. With
+    ``track_segments`` the state also keeps a SegmentTracker, which costs a
+    little per move but lets move generation put safe moves first. Boards
+    above MAX_SEARCH_BOARD_SIZE raise ValueError.
+    """
+
+    def __init__(self, board_size, simple, letters="", track_segments=False):
+        if board_size > MAX_SEARCH_BOARD_SIZE:
+            raise ValueError(f"Search supports boards up to {MAX_SEARCH_BOARD_SIZE}x{MAX_SEARCH_BOARD_SIZE}, "
+                             f"not {board_size}x{board_size}")
+        self.board_size = board_size
+        self.simple = simple
+        self.board = BitBoard(board_size)
+        self.empty = EmptyCellIndex(board_size)
+        self.segments = SegmentTracker(board_size) if track_segments else None
+        self.symmetry = SymmetricHash(board_size)
+        for cell, letter in enumerate(letters):
+            if letter != ' ':
+                self.play(cell // board_size, cell % board_size, letter)
+
+    @classmethod
+    def from_game_mode(cls, game_mode, track_segments=False):
+        """Copies the current position of a game mode, reusing the mode's segment tracker when it keeps one."""
+        # Copying the tracker is much cheaper than replaying every letter into a new one
+        segments = game_mode.segments if track_segments else None
+        state = cls(game_mode.board_size, isinstance(game_mode, SimpleGameMode), board_letters(game_mode),
+                    track_segments and segments is None)
+        if segments is not None:
+            state.segments = segments.copy()
+        return state
+
+    def play(self, row, col, letter):
+        """Places a letter on an empty cell."""
+        self.board.place(row, col, letter)
+        self.empty.remove(row, col)
+        if self.segments is not None:
+            self.segments.place(row * self.board_size + col, letter)
+        self.symmetry.toggle(row * self.board_size + col, letter)
+
+    def unplay(self, row, col, letter):
+        """Takes back a letter placed with ``play``."""
+        self.board.clear(row, col)
+        self.empty.add(row, col)
+        if self.segments is not None:
+            self.segments.remove(row * self.board_size + col)
+        self.symmetry.toggle(row * self.board_size + col, letter)
+
+    def scored_moves(self):
+        """Returns every legal move as (gain, row, col, letter), SOS-completing moves first.
+
+        Completing cells come from the board's whole-board masks, so exact SOS
+        counts are only computed for the few moves that actually score. When
+        segments are tracked, both the counts and the order of the remaining
+        moves come from the tracker: moves that hand the opponent an SOS last.
+        """
+        if self.segments is not None:
+            return self.tracked_moves()
+        board = self.board
+        completing = []
+        for letter, mask in zip("SO", board.completing_masks()):
+            while mask:
+                low = mask & -mask
+                row, col = board.cell(low.bit_length() - 1)
+                board.place(row, col, letter)
+                completing.append((board.count_sos(row, col), row, col, letter))
+                board.clear(row, col)
+                mask ^= low
+        if not completing:
+            return [(0, row, col, letter) for row, col in self.empty for letter in "SO"]
+
+        completing.sort(reverse=True)
+        scoring = {move[1:] for move in completing}
+        return completing + [(0, row, col, letter) for row, col in self.empty for letter in "SO"
+                             if (row, col, letter) not in scoring]
+
+    def tracked_moves(self):
+        """scored_moves answered from the segment tracker's completing and threat sets."""
+        size = self.board_size
+        completing = self.segments.completing
+        threats = self.segments.threats
+        moves = sorted(((gain, key // 2 // size, key // 2 % size, "SO"[key & 1])
+                        for key, gain in completing.items()), reverse=True)
+        risky = []
+        for row, col in self.empty:
+            key = 2 * (row * size + col)
+            for letter in "SO":
+                if key not in completing:
+                    if key in threats:
+                        risky.append((0, row, col, letter))
+                    else:
+                        moves.append((0, row, col, letter))
+                key += 1
+        return moves + risky
+
+
+class SearchCancelled(Exception):
+    """Raised inside a search to unwind it after cancel() was called or its deadline passed."""
+
+
+class TranspositionTable:
+    """Fixed-size table of search results that never grows past its memory budget.
+
+    Each slot holds one entry tuple (key, depth, value, flag, move, generation)
+    and is addressed by the low bits of the Zobrist key. A new result replaces
+    the slot when it is empty, holds the same position, was written during an
+    earlier search, or was searched less deeply than the new result.
+    """
+
+    def __init__(self, memory_budget=16 * 1024 * 1024):
+        slots = 1
+        while slots * 2 * TABLE_ENTRY_BYTES <= memory_budget:
+            slots *= 2
+        self.mask = slots - 1
+        self.entries = [None] * slots
+        self.generation = 0
+        self.probes = 0
+        self.hits = 0
+
+    def __len__(self):
+        return len(self.entries)
+
+    def new_search(self):
+        """Starts a new search generation so entries from earlier searches become replaceable."""
+        self.generation += 1
+
+    def clear(self):
+        """Drops every stored entry."""
+        self.entries = [None] * len(self.entries)
+
+    def probe(self, key):
+        """Returns the entry stored for a position, or None."""
+        self.probes += 1
+        entry = self.entries[key & self.mask]
+        if entry is not None and entry[0] == key:
+            self.hits += 1
+            return entry
+        return None
+
+    def store(self, key, depth, value, flag, move):
+        """Records a search result, subject to the replacement policy."""
+        index = key & self.mask
+        old = self.entries[index]
+        if old is None or old[0] == key or old[5] != self.generation or depth >= old[1]:
+            self.entries[index] = (key, depth, value, flag, move, self.generation)
+
+
+class AlphaBetaSearch:
+    """Depth-limited negamax search with alpha-beta pruning and a transposition table.
+
+    In General rules a move that forms an SOS keeps the turn, so its child is
+    searched from the same side's point of view and its value is added rather
+    than negated. In Simple rules any SOS-completing move wins outright.
+    """
+
+    def __init__(self, max_depth=2, table_memory=16 * 1024 * 1024, rng=None, track_segments=True):
+        self.max_depth = max_depth
+        self.track_segments = track_segments
+        self.table = TranspositionTable(table_memory)
+        # Drawn from the global RNG by default, so seeding it makes the search reproducible
+        self.rng = rng or random.Random(random.getrandbits(64))
+        self.nodes = 0  # Nodes visited by every search so far, pondering included
+        self.root_move = None
+        self.last_value = None
+        self.stopped = False
+        self.deadline = INFINITY  # perf_counter() time at which a search gives up
+        self.last_stats = None
+        self.table_rules = None  # (board size, simple) the table entries belong to
+
+    def cancel(self):
+        """Stops a running search (from another thread); best_move then returns None."""
+        self.stopped = True
+
+    def use_table_for(self, state):
+        """Clears the transposition table if it holds entries of another board size or rule set.
+
+        Hashes only cover the letters on the board, so entries from Simple and
+        General searches of the same board would otherwise be mixed up.
+        """
+        rules = (state.board_size, state.simple)
+        if rules != self.table_rules:
+            self.table.clear()
+            self.table_rules = rules
+
+    def best_move(self, game_mode):
+        """Returns the best (row, col, letter) found for the side to move.
+
+        Returns None if the board is full or the search was cancelled.
+        """
+        if game_mode.empty_cells.is_full():
+            return None
+        state = SearchState.from_game_mode(game_mode, self.track_segments)
+        self.use_table_for(state)
+        self.table.new_search()
+        self.root_move = None
+        self.stopped = False
+        self.deadline = INFINITY
+        cached = self.cached_root(state, self.max_depth)
+        if cached is not None:
+            # Already searched this deep (e.g. while pondering)
+            _, self.last_value, self.root_move = cached
+            return self.root_move
+        try:
+            self.last_value = self.negamax(state, self.max_depth, -INFINITY, INFINITY, root=True)
+        except SearchCancelled:
+            return None
+        return self.root_move
+
+    def timed_best_move(self, game_mode, time_budget, max_depth=None):
+        """Deepens the search one ply at a time and returns the best move of the deepest completed depth.
+
+        The search is abandoned when ``time_budget`` seconds have passed, so
+        the call returns within about one node's work of the deadline on the
+        boards a SearchState accepts (up to MAX_SEARCH_BOARD_SIZE); copying
+        the position out of the game counts against the budget. If not even the depth-1 search completes, the best move
+        by move ordering (the biggest SOS, else one that hands over none) is
+        returned. Depth reached, time used and node count are kept in
+        ``last_stats``. Returns None if the board is full or on cancel().
+        """
+        start = time.perf_counter()
+        if game_mode.empty_cells.is_full():
+            return None
+        state = SearchState.from_game_mode(game_mode, self.track_segments)
+        self.use_table_for(state)
+        remaining = len(state.empty)
+        max_depth = min(max_depth or remaining, remaining)
+        first_node = self.nodes
+        self.stopped = False
+        self.deadline = start + time_budget
+        best_move = state.scored_moves()[0][1:]
+        depth_reached = 0
+        cached = self.cached_root(state, 1)
+        if cached is not None:
+            # Depths an earlier search (e.g. pondering) already finished need no repeat
+            depth_reached, self.last_value, best_move = cached
+            depth_reached = min(depth_reached, max_depth)
+            if state.simple and abs(self.last_value) >= WIN_SCORE:
+                max_depth = depth_reached
+        try:
+            for depth in range(depth_reached + 1, max_depth + 1):
+                self.table.new_search()
+                self.root_move = None
+                value = self.negamax(state, depth, -INFINITY, INFINITY, root=True)
+                best_move, depth_reached, self.last_value = self.root_move, depth, value
+                if state.simple and abs(value) >= WIN_SCORE:
+                    break  # Forced win or loss found: deeper search cannot change the outcome
+        except SearchCancelled:
+            if self.stopped:
+                return None
+        finally:
+            self.deadline = INFINITY
+        self.root_move = best_move
+        self.last_stats = {
+            "depth": depth_reached,
+            "seconds": time.perf_counter() - start,
+            "nodes": self.nodes - first_node,
+            "value": self.last_value if depth_reached else None,
+        }
+        return best_move
+
+    def ponder(self, game_mode, max_depth=None):
+        """Searches every reply the opponent can make, until cancel(), to prepare our coming turn.
+
+        Meant to run on a background thread while the opponent thinks; the
+        caller resets ``stopped`` before starting it. Each position the
+        opponent can hand back to us is searched as a root, one depth at a
+        time across all replies (likely ones first), so whichever reply is
+        played, best_move and timed_best_move find its exact result in the
+        table. Scoring replies are skipped: the opponent moves again after
+        them (General) or has won (Simple).
+        """
+        if game_mode.empty_cells.is_full():
+            return
+        state = SearchState.from_game_mode(game_mode, self.track_segments)
+        self.use_table_for(state)
+        replies = [move[1:] for move in state.scored_moves() if move[0] == 0]
+        remaining = len(state.empty) - 1
+        try:
+            for depth in range(1, min(max_depth or remaining, remaining) + 1):
+                self.table.new_search()
+                for row, col, letter in replies:
+                    state.play(row, col, letter)
+                    if not state.empty.is_full():
+                        self.negamax(state, depth, -INFINITY, INFINITY, root=True)
+                    state.unplay(row, col, letter)
+        except SearchCancelled:
+            pass
+
+    def cached_root(self, state, depth):
+        """Returns (depth, value, move) of an exact result stored for this root at least ``depth`` deep, or None."""
+        key, transform = state.symmetry.canonical()
+        entry = self.table.probe(key)
+        if entry is not None and entry[1] >= depth and entry[3] == EXACT and entry[4] is not None:
+            return entry[1], entry[2], transform_move(entry[4], INVERSE[transform], state.board_size)
+        return None
+
+    def negamax(self, state, depth, alpha, beta, root=False):
+        """Returns the value of the position for the side to move."""
+        self.nodes += 1
+        if self.stopped or time.perf_counter() > self.deadline:
+            raise SearchCancelled
+        if state.empty.is_full():
+            return 0
+
+        alpha_orig = alpha
+        table_move = None
+        key, transform = state.symmetry.canonical()
+        entry = self.table.probe(key)
+        if entry is not None:
+            if entry[4] is not None:
+                # Stored in the canonical frame
+                table_move = transform_move(entry[4], INVERSE[transform], state.board_size)
+            if not root and entry[1] >= depth:
+                value, flag = entry[2], entry[3]
+                if flag == EXACT:
+                    return value
+                if flag == LOWER:
+                    alpha = max(alpha, value)
+                else:
+                    beta = min(beta, value)
+                if alpha >= beta:
+                    return value
+
+        if depth == 0 and state.segments is not None:
+            # Leaf: the tracker knows the best immediate gain without listing every move
+            gain = max(state.segments.completing.values(), default=0)
+            if state.simple:
+                return WIN_SCORE if gain > 0 else 0
+            return gain
+
+        moves = state.scored_moves()
+        if state.simple and moves[0][0] > 0:
+            # Completing an SOS wins on the spot; sooner wins score higher
+            if root:
+                self.root_move = moves[0][1:]
+            return WIN_SCORE + depth
+        if depth == 0:
+            return 0 if state.simple else moves[0][0]
+
+        if root:
+            # Moves the position's symmetries map onto each other are worth the same
+            moves = unique_moves(moves, state.symmetry.symmetries(), state.board_size)
+            # Break ties between equally good moves at random, keeping scoring moves first
+            self.rng.shuffle(moves)
+            moves.sort(key=lambda move: -move[0])
+        if table_move is not None:
+            for index, move in enumerate(moves):
+                if move[1:] == table_move:
+                    moves.insert(0, moves.pop(index))
+                    break
+
+        best_value = -INFINITY
+        best_move = None
+        for gain, row, col, letter in moves:
+            state.play(row, col, letter)
+            if state.empty.is_full():
+                value = gain
+            elif gain > 0:
+                # Extra turn: same side moves again, so the child value is not negated
+                value = gain + self.negamax(state, depth - 1, alpha - gain, beta - gain)
+            else:
+                value = -self.negamax(state, depth - 1, -beta, -alpha)
+            state.unplay(row, col, letter)
+
+            if value > best_value:
+                best_value = value
+                best_move = (row, col, letter)
+                if value > alpha:
+                    alpha = value
+                    if alpha >= beta:
+                        break
+
+        if best_value <= alpha_orig:
+            flag = UPPER
+        elif best_value >= beta:
+            flag = LOWER
+        else:
+            flag = EXACT
+        self.table.store(key, depth, best_value, flag,
+                         transform_move(best_move, transform, state.board_size) if best_move else None)
+        if root:
+            # Any symmetric image of the best move is as good; pick one at random
+            self.root_move = transform_move(best_move, self.rng.choice(state.symmetry.symmetries()),
+                                            state.board_size)
+        return best_value
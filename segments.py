@@ -0,0 +1,250 @@
+# segments.py
+#
+# Line-segment index for SOS detection. Every straight triple of cells that
+# could spell S-O-S is a segment; the table of segments, and of the segments
+# each cell belongs to, is computed once per board size and cached.
+#
+# A SegmentTracker follows one game: it keeps per-segment counters of correct
+# and wrong letters as moves are made and undone, and from them maintains two
+# move sets that strategies query on every turn:
+#
+#   completing  moves that finish an SOS right now, with how many they finish
+#   threats     moves that leave a segment one letter short of an SOS, i.e.
+#               hand the opponent an SOS on the next move
+#
+# Moves are keyed as ``2 * cell + letter_bit`` with cell = row * size + col
+# and letter_bit 0 for S, 1 for O.
+#
+# SparseSegmentTracker is the variant for very large boards: it computes the
+# segments through a cell on demand instead of tabulating all of them, and
+# keeps its counters in dicts, so its memory grows with the moves played.
+
+import functools
+
+from boards import DIRECTIONS
+
+# Letter each position of a segment needs
+REQUIRED = "SOS"
+
+
+def move_key(cell, letter):
+    """Returns the key of placing ``letter`` on flat cell index ``cell``."""
+    return 2 * cell + (letter == 'O')
+
+
+class SegmentTable:
+    """Every SOS triple of an n x n board and, for each cell, the triples through it."""
+
+    def __init__(self, board_size):
+        self.board_size = board_size
+        segments = []
+        for row in range(board_size):
+            for col in range(board_size):
+                for dr, dc in DIRECTIONS:
+                    end_row, end_col = row + 2 * dr, col + 2 * dc
+                    if 0 <= end_row < board_size and 0 <= end_col < board_size:
+                        segments.append((row * board_size + col,
+                                         (row + dr) * board_size + col + dc,
+                                         end_row * board_size + end_col))
+        self.segments = tuple(segments)
+        cell_segments = [[] for _ in range(board_size * board_size)]
+        for segment, cells in enumerate(segments):
+            for position, cell in enumerate(cells):
+                cell_segments[cell].append((segment, position))
+        # (segment, position in segment) pairs for every cell
+        self.cell_segments = tuple(tuple(pairs) for pairs in cell_segments)
+
+    def __reduce__(self):
+        # Trackers sent to other processes rebuild the table there instead of pickling it
+        return segment_table, (self.board_size,)
+
+
+@functools.lru_cache(maxsize=8)
+def segment_table(board_size):
+    """Returns the shared SegmentTable for a board size; only the most recent sizes stay cached."""
+    return SegmentTable(board_size)
+
+
+class SegmentTracker:
+    """Per-segment fill state of one board, updated incrementally as letters are placed and removed."""
+
+    def __init__(self, board_size):
+        self.board_size = board_size
+        self.table = segment_table(board_size)
+        self.letters = [' '] * (board_size * board_size)
+        self.correct = [0] * len(self.table.segments)
+        self.wrong = [0] * len(self.table.segments)
+        self.completing = {}  # move key -> number of SOS the move completes
+        self.threats = {}  # move key -> number of segments the move leaves one letter short
+
+    def copy(self):
+        """Returns an independent tracker in the same state (the segment table is shared)."""
+        clone = SegmentTracker.__new__(SegmentTracker)
+        clone.board_size = self.board_size
+        clone.table = self.table
+        clone.letters = self.letters[:]
+        clone.correct = self.correct[:]
+        clone.wrong = self.wrong[:]
+        clone.completing = dict(self.completing)
+        clone.threats = dict(self.threats)
+        return clone
+
+    def _update(self, segment, sign):
+        """Adds (sign=1) or withdraws (sign=-1) a segment's contribution to the move sets."""
+        if self.wrong[segment]:
+            return
+        missing = 3 - self.correct[segment]
+        if missing == 1:
+            target = self.completing
+        elif missing == 2:
+            target = self.threats
+        else:
+            return
+        letters = self.letters
+        for position, cell in enumerate(self.table.segments[segment]):
+            if letters[cell] == ' ':
+                key = 2 * cell + (position == 1)
+                count = target.get(key, 0) + sign
+                if count:
+                    target[key] = count
+                else:
+                    del target[key]
+
+    def place(self, cell, letter):
+        """Records ``letter`` placed on an empty flat cell index."""
+        pairs = self.table.cell_segments[cell]
+        update = self._update
+        for segment, _ in pairs:
+            update(segment, -1)
+        self.letters[cell] = letter
+        for segment, position in pairs:
+            if letter == REQUIRED[position]:
+                self.correct[segment] += 1
+            else:
+                self.wrong[segment] += 1
+            update(segment, 1)
+
+    def remove(self, cell):
+        """Records the letter on a flat cell index being taken back."""
+        pairs = self.table.cell_segments[cell]
+        letter = self.letters[cell]
+        update = self._update
+        for segment, _ in pairs:
+            update(segment, -1)
+        self.letters[cell] = ' '
+        for segment, position in pairs:
+            if letter == REQUIRED[position]:
+                self.correct[segment] -= 1
+            else:
+                self.wrong[segment] -= 1
+            update(segment, 1)
+
+    def gain(self, cell, letter):
+        """Returns how many SOS placing ``letter`` on ``cell`` would complete."""
+        return self.completing.get(2 * cell + (letter == 'O'), 0)
+
+    def threat_count(self, cell, letter):
+        """Returns how many segments placing ``letter`` on ``cell`` would leave one letter short."""
+        return self.threats.get(2 * cell + (letter == 'O'), 0)
+
+    def completing_moves(self):
+        """Returns (row, col, letter, gain) for every move that completes an SOS right now."""
+        size = self.board_size
+        return [(key // 2 // size, key // 2 % size, "SO"[key & 1], gain) for key, gain in self.completing.items()]
+
+    def threat_moves(self):
+        """Returns (row, col, letter, count) for every move that hands the opponent an SOS."""
+        size = self.board_size
+        return [(key // 2 // size, key // 2 % size, "SO"[key & 1], count) for key, count in self.threats.items()]
+
+
+class SparseSegments:
+    """``SegmentTable.segments`` computed on demand: segment ``4 * start + direction`` -> its three cells."""
+
+    def __init__(self, board_size):
+        self.board_size = board_size
+
+    def __getitem__(self, segment):
+        dr, dc = DIRECTIONS[segment & 3]
+        start = segment >> 2
+        step = dr * self.board_size + dc
+        return start, start + step, start + 2 * step
+
+
+class SparseCellSegments:
+    """``SegmentTable.cell_segments`` computed on demand: cell -> (segment, position) pairs."""
+
+    def __init__(self, board_size):
+        self.board_size = board_size
+
+    def __getitem__(self, cell):
+        size = self.board_size
+        row, col = divmod(cell, size)
+        pairs = []
+        for direction, (dr, dc) in enumerate(DIRECTIONS):
+            for position in range(3):
+                start_row, start_col = row - position * dr, col - position * dc
+                end_row, end_col = start_row + 2 * dr, start_col + 2 * dc
+                if 0 <= start_row < size and 0 <= start_col < size and 0 <= end_row < size and 0 <= end_col < size:
+                    pairs.append((4 * (start_row * size + start_col) + direction, position))
+        return pairs
+
+
+class SparseSegmentTable:
+    """SegmentTable lookalike whose entries are computed when asked for, for boards too big to tabulate."""
+
+    def __init__(self, board_size):
+        self.board_size = board_size
+        self.segments = SparseSegments(board_size)
+        self.cell_segments = SparseCellSegments(board_size)
+
+
+class SparseArray(dict):
+    """Dict standing in for a list: indexes never written read as ``default`` without being stored."""
+
+    def __init__(self, default, items=()):
+        super().__init__(items)
+        self.default = default
+
+    def __missing__(self, index):
+        return self.default
+
+
+class SparseSegmentTracker(SegmentTracker):
+    """SegmentTracker whose memory is proportional to the moves played rather than the board area."""
+
+    def __init__(self, board_size):
+        self.board_size = board_size
+        self.table = SparseSegmentTable(board_size)
+        self.letters = SparseArray(' ')
+        self.correct = SparseArray(0)
+        self.wrong = SparseArray(0)
+        self.completing = {}
+        self.threats = {}
+
+    def copy(self):
+        clone = SparseSegmentTracker.__new__(SparseSegmentTracker)
+        clone.board_size = self.board_size
+        clone.table = self.table
+        clone.letters = SparseArray(' ', self.letters)
+        clone.correct = SparseArray(0, self.correct)
+        clone.wrong = SparseArray(0, self.wrong)
+        clone.completing = dict(self.completing)
+        clone.threats = dict(self.threats)
+        return clone
+
+
+def make_segment_tracker(board_size, backend="list"):
+    """Creates the segment tracker that goes with a board backend."""
+    return SparseSegmentTracker(board_size) if backend == "sparse" else SegmentTracker(board_size)
+
+
+def track_board(board, board_size, backend="list"):
+    """Returns a new segment tracker holding the letters already on ``board``."""
+    tracker = make_segment_tracker(board_size, backend)
+    for row in range(board_size):
+        for col in range(board_size):
+            letter = board.get(row, col)
+            if letter != ' ':
+                tracker.place(row * board_size + col, letter)
+    return tracker
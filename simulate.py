@@ -0,0 +1,150 @@
+# simulate.py
+#
+# Headless computer-vs-computer simulator. Plays games straight against the
+# game modes (no GUI, no tkinter import) and reports games per second.
+#
+#     python -m simulate --games 10000 --size 8 --mode General
+
+import argparse
+import random
+import time
+
+from boards import BOARD_BACKENDS
+from game_modes import SimpleGameMode, GeneralGameMode
+from game_record import GameRecordWriter
+from player import ComputerPlayer
+
+GAME_MODES = {"Simple": SimpleGameMode, "General": GeneralGameMode}
+
+
+def play_game(mode, players, recorder=None):
+    """Plays one game to completion on an already reset game mode.
+
+    ``players`` maps a color to a player exposing ``choose_move``. Moves are
+    also sent to ``recorder`` (a game_record.GameRecordWriter whose game was
+    begun) when one is given. Returns the winner's color, or None for a draw.
+    """
+    while mode.is_game_active:
+        move = players[mode.current_color].choose_move(mode)
+        if move is None:
+            break
+        mode.make_move(*move)
+        if recorder:
+            recorder.add_move(*move)
+    return mode.winner
+
+
+def run_simulation(games, board_size=3, game_mode="Simple", seed=None, backend="list", record_path=None):
+    """Plays ``games`` random games and returns a summary dictionary.
+
+    With ``record_path`` every game is appended to that game record file.
+    """
+    if seed is not None:
+        random.seed(seed)
+    # Random players never query the segment tracker, so skip maintaining it
+    mode = GAME_MODES[game_mode](board_size, backend=backend, track_segments=False)
+    players = {"Blue": ComputerPlayer("Blue", "Blue"), "Red": ComputerPlayer("Red", "Red")}
+    results = {"Blue": 0, "Red": 0, "Draw": 0}
+
+    recorder = GameRecordWriter(record_path, flush_moves=False) if record_path else None
+
+    start = time.perf_counter()
+    for _ in range(games):
+        mode.reset_game(board_size)
+        if recorder:
+            recorder.begin_game(board_size, game_mode, "Random", "Random", seed or 0)
+        winner = play_game(mode, players, recorder)
+        if recorder:
+            scores = getattr(mode, "sos_count", {"Blue": 0, "Red": 0})
+            recorder.end_game(winner, scores["Blue"], scores["Red"])
+        results[winner or "Draw"] += 1
+    elapsed = time.perf_counter() - start
+    if recorder:
+        recorder.close()
+
+    return {
+        "games": games,
+        "board_size": board_size,
+        "game_mode": game_mode,
+        "backend": backend,
+        "results": results,
+        "seconds": elapsed,
+        "games_per_second": games / elapsed if elapsed > 0 else float("inf"),
+    }
+
+
+def run_batch_simulation(games, board_size=3, game_mode="Simple", seed=None, batch_size=1024):
+    """Plays ``games`` random games on the NumPy lockstep engine and returns a summary dictionary."""
+    # Imported here so the plain simulator keeps working without NumPy installed
+    from batch_engine import BatchEngine
+
+    results = {"Blue": 0, "Red": 0, "Draw": 0}
+    start = time.perf_counter()
+    remaining = games
+    while remaining > 0:
+        engine = BatchEngine(min(batch_size, remaining), board_size, game_mode, seed)
+        engine.play_random()
+        # Always-on consistency check: recount the finished boards from scratch
+        inconsistent = engine.audit()
+        if len(inconsistent):
+            raise RuntimeError(f"Scores disagree with the board in {len(inconsistent)} games, "
+                               f"e.g. game {inconsistent[0]} of batch starting at seed {seed}")
+        for outcome, count in engine.results().items():
+            results[outcome] += count
+        remaining -= engine.games
+        seed = None if seed is None else seed + 1
+    elapsed = time.perf_counter() - start
+
+    return {
+        "games": games,
+        "board_size": board_size,
+        "game_mode": game_mode,
+        "backend": "batch",
+        "results": results,
+        "seconds": elapsed,
+        "games_per_second": games / elapsed if elapsed > 0 else float("inf"),
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Play computer-vs-computer SOS games without a GUI.")
+    parser.add_argument("--games", type=int, default=1000, help="number of games to play")
+    parser.add_argument("--size", type=int, default=3, help="board size (n for an n x n board)")
+    parser.add_argument("--mode", choices=sorted(GAME_MODES), default="Simple", help="game mode")
+    parser.add_argument("--seed", type=int, default=None, help="random seed for reproducible runs")
+    parser.add_argument("--backend", choices=sorted(BOARD_BACKENDS), help="board backend (default: list)")
+    parser.add_argument("--record", metavar="FILE", help="append every game to this game record file")
+    parser.add_argument("--instrument", metavar="FILE",
+                        help="time the move pipeline, print a summary and write it as JSON to FILE")
+    parser.add_argument("--batch", type=int, default=0, metavar="K",
+                        help="play K games at a time on the NumPy lockstep engine")
+    args = parser.parse_args(argv)
+    if args.batch:
+        # The batch engine keeps its own boards and plays no moves through the game modes
+        for option, value in (("--backend", args.backend), ("--record", args.record),
+                              ("--instrument", args.instrument)):
+            if value:
+                parser.error(f"{option} cannot be combined with --batch")
+
+    instrumentation = None
+    if args.instrument:
+        from instrumentation import Instrumentation
+        instrumentation = Instrumentation()
+        instrumentation.enable()
+
+    if args.batch:
+        summary = run_batch_simulation(args.games, args.size, args.mode, args.seed, args.batch)
+    else:
+        summary = run_simulation(args.games, args.size, args.mode, args.seed, args.backend or "list", args.record)
+    results = summary["results"]
+    print(f"{summary['games']} {summary['game_mode']} games on {summary['board_size']}x{summary['board_size']}"
+          f" in {summary['seconds']:.2f}s ({summary['games_per_second']:.1f} games/s)")
+    print(f"Blue wins: {results['Blue']}  Red wins: {results['Red']}  Draws: {results['Draw']}")
+    if instrumentation:
+        instrumentation.disable()
+        print(instrumentation.format_summary())
+        instrumentation.write_json(args.instrument)
+
+
+if __name__ == "__main__":
+    main()
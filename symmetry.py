@@ -0,0 +1,158 @@
+# symmetry.py
+#
+# The SOS rules look the same after any of the 8 rotations and reflections
+# of the square board (the dihedral group of the square), so the 8 images of
+# a position are worth the same and their best moves are images of each
+# other. A SymmetricHash keeps one Zobrist hash per image, packed as 64-bit
+# lanes of one integer so that a move updates all 8 with a single XOR; the
+# canonical form of a position (the image with the smallest hash) and the
+# transform leading to it are thus known at any time without transforming
+# the n * n cells.
+#
+# Anything keyed on positions (transposition tables, position caches,
+# opening data) can key on the canonical hash, storing moves in the
+# canonical frame with transform_move and mapping them back with the inverse
+# transform. The transforms that map a position onto itself (all 8 on an
+# empty board) make moves equivalent; unique_moves keeps one move of each
+# such set.
+#
+#     symmetry = SymmetricHash(size)
+#     symmetry.toggle(cell, letter)  # per move made or taken back
+#     key, transform = symmetry.canonical()
+
+import functools
+import struct
+
+from boards import SPARSE_THRESHOLD
+
+# Image of (row, col) under each transform, given the last row/column index:
+# identity, rotations by 90/180/270 degrees, then reflections in the
+# horizontal axis, the vertical axis, the main diagonal and the anti-diagonal
+TRANSFORMS = (
+    lambda row, col, last: (row, col),
+    lambda row, col, last: (col, last - row),
+    lambda row, col, last: (last - row, last - col),
+    lambda row, col, last: (last - col, row),
+    lambda row, col, last: (last - row, col),
+    lambda row, col, last: (row, last - col),
+    lambda row, col, last: (col, row),
+    lambda row, col, last: (last - col, last - row),
+)
+IDENTITY = 0
+# INVERSE[t] undoes transform t: the quarter turns undo each other, the rest undo themselves
+INVERSE = (0, 3, 2, 1, 4, 5, 6, 7)
+
+_MASK = (1 << 64) - 1
+# Bit offset of each transform's lane in a packed SymmetricHash value
+_SHIFTS = tuple(64 * transform for transform in range(len(TRANSFORMS)))
+_LANES = struct.Struct(f"<{len(TRANSFORMS)}Q")
+
+
+def mix64(value):
+    """SplitMix64 finaliser: a well-spread 64-bit key for any integer."""
+    value = (value + 0x9E3779B97F4A7C15) & _MASK
+    value = ((value ^ (value >> 30)) * 0xBF58476D1CE4E5B9) & _MASK
+    value = ((value ^ (value >> 27)) * 0x94D049BB133111EB) & _MASK
+    return value ^ (value >> 31)
+
+
+def transform_cell(transform, row, col, board_size):
+    """Returns the image of (row, col) under a transform."""
+    return TRANSFORMS[transform](row, col, board_size - 1)
+
+
+def transform_move(move, transform, board_size):
+    """Returns the image of a (row, col, letter) move under a transform."""
+    row, col, letter = move
+    return TRANSFORMS[transform](row, col, board_size - 1) + (letter,)
+
+
+def image_keys(board_size, cell, letter_bit):
+    """Returns the 8 Zobrist keys of a letter on a cell, packed: lane t keys its image under transform t."""
+    keys = 0
+    for transform, shift in zip(TRANSFORMS, _SHIFTS):
+        row, col = transform(cell // board_size, cell % board_size, board_size - 1)
+        keys |= mix64((board_size << 48) | 2 * (row * board_size + col) + letter_bit) << shift
+    return keys
+
+
+@functools.lru_cache(maxsize=None)
+def image_key_table(board_size):
+    """Returns the shared table of packed image_keys per move (2 * cell + letter bit) of a board size.
+
+    Entries are filled in as moves are first toggled, so a position costs
+    only as many key computations as it has letters, however big the board.
+    """
+    return [None] * (2 * board_size * board_size)
+
+
+class SymmetricHash:
+    """Zobrist hashes of all 8 symmetric images of a position, updated incrementally.
+
+    Keys come from a shared table on ordinary boards and are computed per
+    move on sparse-sized ones, so memory never grows with the board.
+    """
+
+    def __init__(self, board_size):
+        self.board_size = board_size
+        self.table = image_key_table(board_size) if board_size <= SPARSE_THRESHOLD else None
+        self.value = 0  # All 8 hashes, 64 bits each
+
+    def copy(self):
+        clone = SymmetricHash.__new__(SymmetricHash)
+        clone.board_size = self.board_size
+        clone.table = self.table
+        clone.value = self.value
+        return clone
+
+    def toggle(self, cell, letter):
+        """Adds a letter placed on flat cell ``cell``, or removes it again (XOR undoes itself)."""
+        move = 2 * cell + (letter == 'O')
+        table = self.table
+        if table is None:
+            self.value ^= image_keys(self.board_size, cell, move & 1)
+            return
+        keys = table[move]
+        if keys is None:
+            keys = table[move] = image_keys(self.board_size, cell, move & 1)
+        self.value ^= keys
+
+    @property
+    def hashes(self):
+        """The 8 image hashes; hashes[t] is the Zobrist hash of the position transformed by t."""
+        return _LANES.unpack(self.value.to_bytes(_LANES.size, "little"))
+
+    @property
+    def hash(self):
+        """Plain Zobrist hash of the position as it stands."""
+        return self.value & _MASK
+
+    def canonical(self):
+        """Returns (canonical hash, transform): the smallest image hash and the transform giving it."""
+        hashes = _LANES.unpack(self.value.to_bytes(_LANES.size, "little"))
+        key = min(hashes)
+        return key, hashes.index(key)
+
+    def symmetries(self):
+        """Returns the transforms that map the position onto itself (always including the identity)."""
+        hashes = self.hashes
+        return [transform for transform, value in enumerate(hashes) if value == hashes[IDENTITY]]
+
+
+def representative(row, col, symmetries, board_size):
+    """Returns the lowest (row, col) among the images of a cell under ``symmetries``."""
+    last = board_size - 1
+    return min(TRANSFORMS[transform](row, col, last) for transform in symmetries)
+
+
+def unique_moves(moves, symmetries, board_size):
+    """Keeps one move of every set that the position's ``symmetries`` map onto each other.
+
+    ``moves`` are tuples ending in (row, col, letter), as from
+    SearchState.scored_moves; the move kept is the one on the lowest cell
+    of its set, and the order of the kept moves is unchanged.
+    """
+    if len(symmetries) == 1:
+        return moves
+    return [move for move in moves
+            if representative(move[-3], move[-2], symmetries, board_size) == (move[-3], move[-2])]
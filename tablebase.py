@@ -0,0 +1,191 @@
+# tablebase.py
+#
+# Perfect-play tables for small boards. Every position of an n x n board is
+# numbered in base 3, one digit per cell (0 empty, 1 S, 2 O; cell
+# row * n + col is digit 3 ** cell), so a 4x4 board has 3 ** 16 positions.
+# The offline solver fills in, for every position, the game-theoretic value
+# for the side to move and a best move, working backwards from full boards
+# one level of filled cells at a time with NumPy.
+#
+# As in search.py, values depend only on the letters on the board: the net
+# number of SOS the side to move will still score (General rules) or
+# 1/0/-1 for a win, draw or loss (Simple rules). Among moves of equal value
+# the solver prefers the one that scores the most SOS right away.
+#
+# A table file is a header followed by two arrays of 3 ** (n * n) bytes:
+# the values (int8) and the best moves (uint8, 2 * cell + letter bit, or
+# NO_MOVE). Tablebase memory-maps a file and answers lookups in O(1).
+#
+#     python -m tablebase --sizes 3 4 --modes Simple General
+
+import argparse
+import mmap
+import os
+import struct
+import sys
+import time
+
+from game_modes import SimpleGameMode
+from search import board_letters
+from segments import REQUIRED, segment_table
+
+MAGIC = b"SOTB"
+VERSION = 1
+# magic, version, board size, mode (0 Simple, 1 General), position count
+HEADER = struct.Struct("<4sBBBxQ")
+NO_MOVE = 255
+DIGITS = {' ': 0, 'S': 1, 'O': 2}
+
+TABLEBASE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "tablebases")
+# Largest board the solver accepts (3 ** 25 positions would not fit in memory)
+MAX_SOLVED_SIZE = 4
+
+
+def table_path(board_size, game_mode, directory=None):
+    """Returns where the table for a board size and mode ("Simple"/"General") lives."""
+    return os.path.join(directory or TABLEBASE_DIR, f"sos_{game_mode.lower()}_{board_size}x{board_size}.tb")
+
+
+def position_index(letters):
+    """Returns the base-3 index of a board given as a string of letters, row by row."""
+    index = 0
+    for letter in reversed(letters):
+        index = 3 * index + DIGITS[letter]
+    return index
+
+
+def solve(board_size, simple, progress=None):
+    """Solves every position of a board size; returns (values, moves) NumPy arrays indexed by position.
+
+    ``progress`` is called with (filled cells, positions) as each level is done.
+    """
+    import numpy as np
+
+    if board_size > MAX_SOLVED_SIZE:
+        raise ValueError(f"Board size {board_size} is too large to solve")
+    cells = board_size * board_size
+    powers = [3 ** cell for cell in range(cells)]
+    # SOS letter needed on the other two cells, per cell and letter placed there
+    partners = [{letter: [] for letter in "SO"} for _ in range(cells)]
+    for segment in segment_table(board_size).segments:
+        for position, cell in enumerate(segment):
+            others = [(other, DIGITS[REQUIRED[index]]) for index, other in enumerate(segment) if index != position]
+            partners[cell][REQUIRED[position]].append(others)
+
+    # Filled cell count of every position, built digit by digit
+    filled = np.zeros(1, dtype=np.uint8)
+    for _ in range(cells):
+        filled = np.concatenate([filled, filled + 1, filled + 1])
+    values = np.zeros(3 ** cells, dtype=np.int8)
+    moves = np.full(3 ** cells, NO_MOVE, dtype=np.uint8)
+
+    # Full boards keep value 0 and no move; every other level only needs the level above it
+    for level in range(cells - 1, -1, -1):
+        positions = np.flatnonzero(filled == level)
+        digits = [(positions // power % 3).astype(np.int8) for power in powers]
+        # Moves are ranked by value * 32 + immediate gain, so ties go to the move that scores now
+        best = np.full(len(positions), -1 << 14, dtype=np.int16)
+        best_move = np.full(len(positions), NO_MOVE, dtype=np.uint8)
+        for cell in range(cells):
+            empty = np.flatnonzero(digits[cell] == 0)
+            for letter_bit, letter in enumerate("SO"):
+                gain = np.zeros(len(empty), dtype=np.int16)
+                for (first, first_digit), (second, second_digit) in partners[cell][letter]:
+                    gain += (digits[first][empty] == first_digit) & (digits[second][empty] == second_digit)
+                child = values[positions[empty] + (letter_bit + 1) * powers[cell]].astype(np.int16)
+                if simple:
+                    value = np.where(gain > 0, 1, -child)
+                else:
+                    value = gain + np.where(gain > 0, child, -child)
+                rank = value * 32 + gain
+                better = rank > best[empty]
+                improved = empty[better]
+                best[improved] = rank[better]
+                best_move[improved] = 2 * cell + letter_bit
+        values[positions] = best >> 5
+        moves[positions] = best_move
+        if progress:
+            progress(level, len(positions))
+    return values, moves
+
+
+def write_table(path, board_size, simple, values, moves):
+    """Writes solved arrays to a table file."""
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    with open(path, "wb") as handle:
+        handle.write(HEADER.pack(MAGIC, VERSION, board_size, 0 if simple else 1, len(values)))
+        values.tofile(handle)
+        moves.tofile(handle)
+
+
+class Tablebase:
+    """Memory-mapped perfect-play table for one board size and game mode."""
+
+    def __init__(self, path):
+        with open(path, "rb") as handle:
+            self.data = mmap.mmap(handle.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, self.board_size, mode, self.count = HEADER.unpack_from(self.data)
+        if magic != MAGIC or version != VERSION or len(self.data) != HEADER.size + 2 * self.count:
+            self.data.close()
+            raise ValueError(f"{path} is not a valid tablebase file")
+        self.game_mode = ("Simple", "General")[mode]
+
+    def probe(self, index):
+        """Returns (value, move) of a position index; move is (row, col, letter) or None."""
+        value = self.data[HEADER.size + index]
+        code = self.data[HEADER.size + self.count + index]
+        if value > 127:
+            value -= 256
+        if code == NO_MOVE:
+            return value, None
+        row, col = divmod(code >> 1, self.board_size)
+        return value, (row, col, "SO"[code & 1])
+
+    def best_move(self, game_mode):
+        """Returns a perfect move for the current position of a game mode, or None if the board is full."""
+        return self.probe(position_index(board_letters(game_mode)))[1]
+
+    def close(self):
+        self.data.close()
+
+
+_open_tables = {}
+
+
+def open_tablebase(board_size, game_mode, directory=None):
+    """Returns the shared Tablebase for a size and mode, or None when no table file exists."""
+    path = table_path(board_size, game_mode, directory)
+    if path not in _open_tables:
+        _open_tables[path] = Tablebase(path) if os.path.exists(path) else None
+    return _open_tables[path]
+
+
+def tablebase_for(game_mode, directory=None):
+    """open_tablebase for the size and rules of a running game mode."""
+    rules = "Simple" if isinstance(game_mode, SimpleGameMode) else "General"
+    return open_tablebase(game_mode.board_size, rules, directory)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Solve small SOS boards and write perfect-play tables.")
+    parser.add_argument("--sizes", nargs="+", type=int, default=[3, 4], help="board sizes (at most 4)")
+    parser.add_argument("--modes", nargs="+", choices=["Simple", "General"], default=["Simple", "General"],
+                        help="game modes")
+    parser.add_argument("--directory", default=TABLEBASE_DIR, help="where to write the tables")
+    args = parser.parse_args(argv)
+
+    for game_mode in args.modes:
+        for board_size in args.sizes:
+            start = time.perf_counter()
+            values, moves = solve(board_size, game_mode == "Simple")
+            path = table_path(board_size, game_mode, args.directory)
+            write_table(path, board_size, game_mode == "Simple", values, moves)
+            print(f"{game_mode} {board_size}x{board_size}: {len(values):,} positions in "
+                  f"{time.perf_counter() - start:.1f}s, empty board value {values[0]:+d} -> {path}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,57 @@
+import random
+
+from game_modes import GeneralGameMode
+from game_record import GameRecordReader, GameRecordWriter, replay
+
+
+def record_game(writer, seed, finish=True):
+    """Plays a random 4x4 General game into ``writer``; returns its moves."""
+    rng = random.Random(seed)
+    mode = GeneralGameMode(4)
+    mode.reset_game(4)
+    writer.begin_game(4, "General", "Random", "Random", seed)
+    moves = []
+    while mode.is_game_active and (finish or len(moves) < 5):
+        row, col = mode.empty_cells.random_cell(rng)
+        move = (row, col, rng.choice("SO"))
+        mode.make_move(*move)
+        writer.add_move(*move)
+        moves.append(move)
+    if finish:
+        writer.end_game(mode.winner, mode.sos_count["Blue"], mode.sos_count["Red"])
+    return moves
+
+
+def test_records_round_trip(tmp_path):
+    path = tmp_path / "games.sosr"
+    with GameRecordWriter(path) as writer:
+        played = [record_game(writer, seed) for seed in range(3)]
+    with GameRecordReader(path) as reader:
+        assert reader.trailing_moves is None
+        assert [list(reader.moves(index)) for index in range(len(reader))] == played
+        assert all(header.result != "Unfinished" for header in reader)
+        assert not any(replay(reader, index) for index in range(len(reader)))
+
+
+def test_a_game_cut_short_keeps_its_moves(tmp_path):
+    path = tmp_path / "games.sosr"
+    writer = GameRecordWriter(path)
+    finished = record_game(writer, 0)
+    cut_short = record_game(writer, 1, finish=False)
+    writer.flush()
+    # The writer dies here; a stray byte of a move that was being written is left behind
+    with open(path, "ab") as handle:
+        handle.write(b"\x01")
+
+    with GameRecordReader(path) as reader:
+        assert len(reader) == 2 and reader.trailing_moves == len(cut_short)
+        assert reader[1].result == "Unfinished" and reader[1].move_count == len(cut_short)
+        assert list(reader.moves(1)) == cut_short
+
+    # A new writer closes the cut short game off and appends after it
+    with GameRecordWriter(path) as writer:
+        appended = record_game(writer, 2)
+    with GameRecordReader(path) as reader:
+        assert reader.trailing_moves is None
+        assert [list(reader.moves(index)) for index in range(len(reader))] == [finished, cut_short, appended]
+        assert not any(replay(reader, index) for index in range(len(reader)))
@@ -0,0 +1,18 @@
+import asyncio
+
+from game_server import GameServer
+
+
+def test_search_strategies_play_from_the_process_pool():
+    async def play():
+        server = GameServer(workers=1, search_workers=1)
+        try:
+            return await server.handle({"op": "create", "size": 3, "mode": "General",
+                                        "blue": "AlphaBeta", "red": "Random"}, set())
+        finally:
+            server.executors["search"].shutdown()
+
+    response = asyncio.run(play())
+    assert response["ok"] and not response["state"]["active"]
+    assert len(response["moves"]) == 9
+    assert {color for *_, color in response["moves"]} == {"Blue", "Red"}
@@ -0,0 +1,47 @@
+import random
+
+from endgame import ENDGAME_THRESHOLD
+from game_modes import GeneralGameMode
+from instrumentation import Instrumentation
+from player import AlphaBetaPlayer
+
+
+def played(board_size, empty, seed=0):
+    """Returns a General game with random moves played until ``empty`` cells are left."""
+    rng = random.Random(seed)
+    mode = GeneralGameMode(board_size)
+    mode.reset_game(board_size)
+    while len(mode.empty_cells) > empty:
+        row, col = mode.empty_cells.random_cell(rng)
+        mode.make_move(row, col, rng.choice("SO"))
+    return mode
+
+
+def counted(player, mode):
+    """Returns the search counters instrumentation adds for one choose_move."""
+    instrumentation = Instrumentation()
+    instrumentation.enable()
+    try:
+        player.choose_move(mode)
+    finally:
+        instrumentation.disable()
+    return instrumentation.search["AlphaBetaPlayer"]
+
+
+def test_moves_answered_by_the_endgame_solver_count_only_its_nodes():
+    player = AlphaBetaPlayer("Blue", "Blue")
+    player.choose_move(played(5, ENDGAME_THRESHOLD + 5))  # Leaves the search with a node count
+    assert player.search.nodes > 0
+    counters = counted(player, played(5, ENDGAME_THRESHOLD - 2))
+    assert counters["nodes"] == 0
+    assert counters["endgame_nodes"] > 0
+
+
+def test_searched_moves_count_their_own_nodes():
+    player = AlphaBetaPlayer("Blue", "Blue")
+    mode = played(5, ENDGAME_THRESHOLD + 5)
+    first = counted(player, mode)
+    second = counted(player, mode)
+    assert first["nodes"] > 0 and first["endgame_nodes"] == 0
+    # The repeat is answered from the transposition table
+    assert second["nodes"] < first["nodes"]
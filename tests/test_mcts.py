@@ -0,0 +1,27 @@
+import threading
+import time
+
+from game_modes import GeneralGameMode
+from mcts import MCTSSearch
+
+
+def test_closing_the_pool_mid_search_ends_the_search():
+    mode = GeneralGameMode(4)
+    mode.reset_game(4)
+    search = MCTSSearch(time_budget=30.0, workers=2)
+    results = []
+    thread = threading.Thread(target=lambda: results.append(search.best_move(mode)))
+    thread.start()
+    while search.pool is None:
+        time.sleep(0.01)
+    time.sleep(0.2)
+    search.close()
+    thread.join(5.0)
+    assert not thread.is_alive() and results == [None]
+
+    # The next search starts a new pool
+    search.time_budget = 0.1
+    try:
+        assert search.best_move(mode) is not None
+    finally:
+        search.close()
@@ -0,0 +1,45 @@
+import pytest
+
+from game_manager import GameManager
+from game_modes import GeneralGameMode
+from player import PLAYER_STRATEGIES, GreedyPlayer, create_player
+from search import MAX_SEARCH_BOARD_SIZE
+
+
+@pytest.mark.parametrize("strategy", ["AlphaBeta", "Anytime", "MCTS", "Tablebase"])
+def test_search_strategies_reject_boards_above_the_limit(strategy):
+    assert create_player(strategy, "Blue", "Blue", MAX_SEARCH_BOARD_SIZE).max_board_size == MAX_SEARCH_BOARD_SIZE
+    with pytest.raises(ValueError, match=f"up to {MAX_SEARCH_BOARD_SIZE}x{MAX_SEARCH_BOARD_SIZE}"):
+        create_player(strategy, "Blue", "Blue", MAX_SEARCH_BOARD_SIZE + 1)
+
+
+def test_game_manager_checks_strategies_against_the_board_size():
+    size = MAX_SEARCH_BOARD_SIZE + 10
+    manager = GameManager(size, "Simple")
+    with pytest.raises(ValueError):
+        manager.reset_game(size, "Simple", "Human", "AlphaBeta")
+    for player_type in ["Human", "Computer", "Random", "Greedy"]:
+        manager.reset_game(size, "Simple", player_type, player_type)
+        assert manager.players["Blue"] is not None
+
+
+def test_unlimited_strategies_play_any_size():
+    limited = {name for name in PLAYER_STRATEGIES
+               if create_player(name, "Blue", "Blue").max_board_size is not None}
+    assert limited == {"AlphaBeta", "Anytime", "MCTS", "Tablebase"}
+
+
+@pytest.mark.parametrize("backend", ["list", "sparse"])
+def test_greedy_plays_modes_without_a_segment_tracker(backend):
+    tracked, untracked = (GeneralGameMode(4, backend=backend, track_segments=track) for track in (True, False))
+    for mode in (tracked, untracked):
+        mode.reset_game(4)
+        for row, col, letter in [(0, 0, "S"), (0, 1, "O"), (3, 3, "S")]:
+            mode.make_move(row, col, letter)
+    assert untracked.segments is None
+    # Both modes offer the same single completing move, (0, 2, "S")
+    player = GreedyPlayer("Blue", "Blue")
+    assert player.choose_move(untracked) == player.choose_move(tracked) == (0, 2, "S")
+    untracked.make_move(0, 2, "S")
+    row, col, letter = player.choose_move(untracked)
+    assert untracked.board.get(row, col) == " "
@@ -0,0 +1,41 @@
+import random
+import time
+
+import pytest
+
+from game_modes import GeneralGameMode, SimpleGameMode
+from player import AnytimePlayer
+from search import MAX_SEARCH_BOARD_SIZE, SearchState
+
+
+def half_filled(mode_class, board_size, seed):
+    """Returns a game mode with random letters on about a third of the board."""
+    rng = random.Random(seed)
+    mode = mode_class(board_size)
+    mode.reset_game(board_size)
+    while mode.is_game_active and len(mode.empty_cells) > 2 * board_size * board_size // 3:
+        row, col = mode.empty_cells.random_cell(rng)
+        mode.make_move(row, col, rng.choice("SO"))
+    return mode
+
+
+@pytest.mark.parametrize("mode_class", [SimpleGameMode, GeneralGameMode])
+def test_anytime_keeps_its_budget_on_the_largest_searchable_board(mode_class):
+    budget = 0.05
+    mode = half_filled(mode_class, MAX_SEARCH_BOARD_SIZE, seed=1)
+    player = AnytimePlayer("Blue", mode.current_color, time_budget=budget)
+    for _ in range(3):
+        start = time.perf_counter()
+        move = player.choose_move(mode)
+        elapsed = time.perf_counter() - start
+        assert move is not None
+        # One node's work past the deadline, plus slack for a loaded machine
+        assert elapsed < 2 * budget
+        mode.make_move(*move)
+        if not mode.is_game_active:
+            break
+
+
+def test_search_rejects_boards_above_the_limit():
+    with pytest.raises(ValueError):
+        SearchState(MAX_SEARCH_BOARD_SIZE + 1, simple=False)
@@ -0,0 +1,230 @@
+# tournament.py
+#
+# Round-robin tournament between registered computer strategies (see
+# player.PLAYER_STRATEGIES). Games are played headless in a process pool in
+# chunks; results stream back as chunks finish and are summarised as
+# win/draw/loss tables per game mode and board size, plus Elo ratings with
+# 95% confidence intervals fitted over every game played.
+#
+#     python -m tournament --players Random AlphaBeta --modes Simple General --sizes 3 5 --games 10000
+
+import argparse
+import itertools
+import json
+import math
+import multiprocessing
+import random
+import time
+
+from player import PLAYER_STRATEGIES, create_player
+from simulate import GAME_MODES, play_game
+
+ELO_BASE = 1500
+ELO_SCALE = 400 / math.log(10)
+CHUNK_SIZE = 100
+
+
+def play_chunk(task):
+    """Plays a chunk of games between two strategies, alternating colors.
+
+    Returns (task, (first wins, second wins, draws)).
+    """
+    first, second, game_mode, board_size, games, seed = task
+    # Players are created after seeding, so their own RNGs derive from the chunk seed too
+    random.seed(seed)
+    players = {
+        first: {"Blue": create_player(first, "Blue", "Blue", board_size),
+                "Red": create_player(first, "Red", "Red", board_size)},
+        second: {"Blue": create_player(second, "Blue", "Blue", board_size),
+                 "Red": create_player(second, "Red", "Red", board_size)},
+    }
+    mode = GAME_MODES[game_mode](board_size)
+    first_wins = second_wins = draws = 0
+    for game in range(games):
+        blue, red = (first, second) if game % 2 == 0 else (second, first)
+        mode.reset_game(board_size)
+        winner = play_game(mode, {"Blue": players[blue]["Blue"], "Red": players[red]["Red"]})
+        if winner is None:
+            draws += 1
+        elif (blue if winner == "Blue" else red) == first:
+            first_wins += 1
+        else:
+            second_wins += 1
+    return task, (first_wins, second_wins, draws)
+
+
+def make_tasks(strategies, game_modes, board_sizes, games, seed):
+    """Splits every pairing x mode x size into chunks of at most CHUNK_SIZE games."""
+    rng = random.Random(seed)
+    tasks = []
+    for first, second in itertools.combinations(strategies, 2):
+        for game_mode in game_modes:
+            for board_size in board_sizes:
+                for start in range(0, games, CHUNK_SIZE):
+                    tasks.append((first, second, game_mode, board_size,
+                                  min(CHUNK_SIZE, games - start), rng.getrandbits(32)))
+    return tasks
+
+
+def invert(matrix):
+    """Inverts a small square matrix with Gauss-Jordan elimination."""
+    size = len(matrix)
+    rows = [list(row) + [1.0 if i == j else 0.0 for j in range(size)] for i, row in enumerate(matrix)]
+    for col in range(size):
+        pivot = max(range(col, size), key=lambda r: abs(rows[r][col]))
+        rows[col], rows[pivot] = rows[pivot], rows[col]
+        scale = rows[col][col]
+        rows[col] = [value / scale for value in rows[col]]
+        for r in range(size):
+            if r != col and rows[r][col]:
+                factor = rows[r][col]
+                rows[r] = [a - factor * b for a, b in zip(rows[r], rows[col])]
+    return [row[size:] for row in rows]
+
+
+def fit_elo(strategies, pair_results, prior_draws=1, iterations=1000):
+    """Fits Bradley-Terry strengths to head-to-head results and converts them to Elo.
+
+    ``pair_results`` maps (first, second) to (first wins, second wins, draws);
+    a draw counts as half a win for each side. ``prior_draws`` virtual draws per
+    pairing keep ratings finite when one side never loses. Returns a dictionary
+    of strategy -> (rating, 95% half-width), ratings averaging ELO_BASE.
+    """
+    index = {name: i for i, name in enumerate(strategies)}
+    size = len(strategies)
+    games = [[0.0] * size for _ in range(size)]
+    score = [0.0] * size
+    for (first, second), (wins, losses, draws) in pair_results.items():
+        i, j = index[first], index[second]
+        total = wins + losses + draws + prior_draws
+        games[i][j] += total
+        games[j][i] += total
+        score[i] += wins + 0.5 * (draws + prior_draws)
+        score[j] += losses + 0.5 * (draws + prior_draws)
+
+    # Minorization-maximization updates of the strengths gamma_i
+    gamma = [1.0] * size
+    for _ in range(iterations):
+        updated = []
+        for i in range(size):
+            denominator = sum(games[i][j] / (gamma[i] + gamma[j]) for j in range(size) if games[i][j])
+            updated.append(score[i] / denominator if denominator else gamma[i])
+        mean_log = sum(math.log(g) for g in updated) / size
+        updated = [g / math.exp(mean_log) for g in updated]
+        converged = max(abs(a - b) for a, b in zip(updated, gamma)) < 1e-10
+        gamma = updated
+        if converged:
+            break
+
+    # Fisher information of the log-strengths; rows sum to zero, so invert it
+    # through the sum-to-zero constraint: L+ = (L + J/k)^-1 - J/k
+    information = [[0.0] * size for _ in range(size)]
+    for i in range(size):
+        for j in range(size):
+            if i != j and games[i][j]:
+                p = gamma[i] / (gamma[i] + gamma[j])
+                weight = games[i][j] * p * (1 - p)
+                information[i][j] -= weight
+                information[i][i] += weight
+    covariance = invert([[value + 1.0 / size for value in row] for row in information])
+
+    ratings = {}
+    for name, i in index.items():
+        variance = max(covariance[i][i] - 1.0 / size, 0.0)
+        ratings[name] = (ELO_BASE + ELO_SCALE * math.log(gamma[i]), 1.96 * ELO_SCALE * math.sqrt(variance))
+    return ratings
+
+
+def run_tournament(strategies, game_modes, board_sizes, games, workers=None, seed=None, progress=None):
+    """Runs the round robin and returns a summary dictionary.
+
+    ``progress`` is called with (finished games, total games) as chunks stream in.
+    """
+    tasks = make_tasks(strategies, game_modes, board_sizes, games, seed)
+    total_games = sum(task[4] for task in tasks)
+    tables = {}
+    pair_results = {}
+    finished = 0
+
+    start = time.perf_counter()
+    with multiprocessing.get_context("spawn").Pool(workers) as pool:
+        for task, (wins, losses, draws) in pool.imap_unordered(play_chunk, tasks):
+            first, second, game_mode, board_size = task[:4]
+            for results in (tables.setdefault((game_mode, board_size), {}), pair_results):
+                old = results.get((first, second), (0, 0, 0))
+                results[(first, second)] = (old[0] + wins, old[1] + losses, old[2] + draws)
+            finished += task[4]
+            if progress:
+                progress(finished, total_games)
+    elapsed = time.perf_counter() - start
+
+    return {
+        "games": total_games,
+        "seconds": elapsed,
+        "games_per_second": total_games / elapsed if elapsed > 0 else float("inf"),
+        "tables": tables,
+        "ratings": fit_elo(strategies, pair_results),
+    }
+
+
+def format_summary(summary):
+    """Formats win/draw/loss tables and the Elo ranking as text."""
+    lines = []
+    for (game_mode, board_size), results in sorted(summary["tables"].items()):
+        lines.append(f"{game_mode} {board_size}x{board_size}")
+        for (first, second), (wins, losses, draws) in sorted(results.items()):
+            lines.append(f"  {first} vs {second}: W {wins}  D {draws}  L {losses}")
+    lines.append("Elo ratings (95% CI)")
+    for name, (rating, margin) in sorted(summary["ratings"].items(), key=lambda item: -item[1][0]):
+        lines.append(f"  {name:<12} {rating:7.1f} +/- {margin:.1f}")
+    lines.append(f"{summary['games']} games in {summary['seconds']:.1f}s ({summary['games_per_second']:.0f} games/s)")
+    return "\n".join(lines)
+
+
+def summary_to_json(summary):
+    """Converts a tournament summary to JSON-serialisable data."""
+    return {
+        "games": summary["games"],
+        "seconds": summary["seconds"],
+        "games_per_second": summary["games_per_second"],
+        "tables": [
+            {"game_mode": game_mode, "board_size": board_size, "first": first, "second": second,
+             "wins": wins, "losses": losses, "draws": draws}
+            for (game_mode, board_size), results in sorted(summary["tables"].items())
+            for (first, second), (wins, losses, draws) in sorted(results.items())
+        ],
+        "ratings": {name: {"elo": rating, "ci95": margin} for name, (rating, margin) in summary["ratings"].items()},
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Round-robin tournament between computer strategies.")
+    parser.add_argument("--players", nargs="+", choices=sorted(PLAYER_STRATEGIES), default=["Random", "AlphaBeta"],
+                        help="strategies to enter")
+    parser.add_argument("--modes", nargs="+", choices=sorted(GAME_MODES), default=["Simple", "General"],
+                        help="game modes to play")
+    parser.add_argument("--sizes", nargs="+", type=int, default=[3], help="board sizes to play")
+    parser.add_argument("--games", type=int, default=1000, help="games per pairing, mode and size")
+    parser.add_argument("--workers", type=int, default=None, help="worker processes (default: all cores)")
+    parser.add_argument("--seed", type=int, default=None,
+                        help="random seed for reproducible runs (time-budgeted strategies still vary with load)")
+    parser.add_argument("--output", help="also write the results as JSON to this file")
+    args = parser.parse_args(argv)
+
+    if len(set(args.players)) < 2:
+        parser.error("at least two distinct strategies are needed")
+
+    def progress(finished, total):
+        print(f"\r{finished}/{total} games", end="", flush=True)
+
+    summary = run_tournament(list(dict.fromkeys(args.players)), args.modes, args.sizes, args.games,
+                             args.workers, args.seed, progress)
+    print()
+    print(format_summary(summary))
+    if args.output:
+        with open(args.output, "w") as handle:
+            json.dump(summary_to_json(summary), handle, indent=2)
+
+
+if __name__ == "__main__":
+    main()